@@ -5,6 +5,8 @@ Simple runner script for the AI News Summarizer pipeline.
 
 import asyncio
 import argparse
+import functools
+import logging
 import sys
 from pathlib import Path
 
@@ -13,6 +15,22 @@ sys.path.append(str(Path(__file__).parent))
 
 from src.pipeline.news_pipeline import NewsPipeline
 
+# (argument, config key path, value) applied when the argument is set
+OVERRIDES = [
+    ('preview', ('publishing', 'twitter', 'enabled'), lambda args: False),
+    ('preview', ('publishing', 'github', 'enabled'), lambda args: False),
+    ('niche', ('niche',), lambda args: args.niche),
+    ('max_articles', ('summarization', 'max_articles_per_run'), lambda args: args.max_articles),
+]
+
+
+def apply_overrides(config: dict, args: argparse.Namespace):
+    """Apply command line overrides, creating missing config sections."""
+    for arg_name, path, value in OVERRIDES:
+        if getattr(args, arg_name):
+            section = functools.reduce(lambda d, key: d.setdefault(key, {}), path[:-1], config)
+            section[path[-1]] = value(args)
+
 
 async def main():
     parser = argparse.ArgumentParser(
@@ -82,16 +100,14 @@ Examples:
     # Override configuration based on arguments
     if args.preview:
         print("🔍 Running in preview mode - publishing disabled")
-        pipeline.config['publishing']['twitter']['enabled'] = False
-        pipeline.config['publishing']['github']['enabled'] = False
     
     if args.niche:
         print(f"📰 Using niche: {args.niche}")
-        pipeline.config['niche'] = args.niche
     
     if args.max_articles:
         print(f"📊 Processing maximum {args.max_articles} articles")
-        pipeline.config['summarization']['max_articles_per_run'] = args.max_articles
+    
+    apply_overrides(pipeline.config, args)
     
     if 'all' not in args.sources:
         if 'rss' not in args.sources:
@@ -126,7 +142,18 @@ Examples:
     except Exception as e:
         print(f"\n❌ Pipeline failed: {e}")
         sys.exit(1)
+    finally:
+        await pipeline.close()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    # libuv-backed event loop where available (Linux/macOS)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
\ No newline at end of file
@@ -24,9 +24,10 @@ class AiNewsSummarizer:
             .with_exec(["apt-get", "update", "-qq"])
             .with_exec(["apt-get", "install", "-y", "-qq", "git", "curl"])
             .with_exec(["pip", "install", "--no-cache-dir", 
-                       "httpx", "beautifulsoup4", "lxml", "feedparser",
+                       "httpx[http2]", "selectolax", "lxml", "feedparser",
                        "python-dateutil", "anthropic", "tiktoken", 
-                       "tenacity", "jinja2", "pyyaml", "cachetools"])
+                       "tenacity", "jinja2", "pyyaml", "cachetools",
+                       "blake3", "aiolimiter", "ciso8601", "msgpack"])
         )
     
     @function
@@ -61,6 +62,7 @@ async def test():
     }]
     
     articles = await parser.parse_all_feeds(feeds)
+    await parser.aclose()
     print(f"Successfully parsed {len(articles)} articles!")
     for i, article in enumerate(articles[:2], 1):
         print(f"{i}. {article.title[:60]}...")
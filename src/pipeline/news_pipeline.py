@@ -4,25 +4,105 @@ import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-import json
-import hashlib
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, TYPE_CHECKING
+from contextlib import AsyncExitStack
+import copy
+import functools
+from dataclasses import dataclass
 
 import dagger
+import httpx
+import msgpack
+import orjson
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 from cachetools import TTLCache
+from pybloom_live import BloomFilter
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.scrapers import WebScraper, RSSParser, Article
-from src.summarizers import GPTSummarizer, Summary
-from src.publishers import MarkdownPublisher, TwitterPublisher, GitHubPublisher
 
-logging.basicConfig(level=logging.INFO)
+if TYPE_CHECKING:
+    from src.summarizers import Summary
+
 logger = logging.getLogger(__name__)
 
+# Seconds the summarizer waits for more articles before flushing a partial batch
+SUMMARY_BATCH_TIMEOUT = 5.0
+
+# Number of article hashes the dedup bloom filter holds before it is rebuilt
+BLOOM_CAPACITY = 100_000
+
+
+class _FeedConfig(TypedDict):
+    url: str
+    name: NotRequired[str]
+    max_articles: NotRequired[int]
+    fetch_full_content: NotRequired[bool]
+
+
+class _ScrapeConfig(TypedDict):
+    url: str
+    name: NotRequired[str]
+    max_articles: NotRequired[int]
+    selectors: NotRequired[Dict[str, str]]
+
+
+class _SourcesConfig(TypedDict, total=False):
+    rss_feeds: Optional[List[_FeedConfig]]
+    web_scraping: Optional[List[_ScrapeConfig]]
+
+
+class _SummarizationConfig(TypedDict, total=False):
+    provider: str
+    model: str
+    fast_model: Optional[str]
+    api_key_env: str
+    temperature: float
+    max_tokens: int
+    max_articles_per_run: int
+    max_concurrent_requests: int
+    requests_per_minute: Optional[int]
+    tokens_per_minute: Optional[int]
+    summary_cache: bool
+    summary_cache_refresh: bool
+
+
+class _PublisherConfig(TypedDict, total=False):
+    enabled: bool
+
+
+class _PipelineConfig(TypedDict, total=False):
+    niche: str
+    sources: _SourcesConfig
+    summarization: _SummarizationConfig
+    publishing: Dict[str, _PublisherConfig]
+    timeout: float
+
+
+# Checks the keys the pipeline relies on; anything else in the file passes through untouched
+_CONFIG_ADAPTER = TypeAdapter(_PipelineConfig)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_yaml(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse and validate a config file; cached per (path, mtime) so unchanged files are parsed once."""
+    with open(path_str, 'r') as f:
+        config = yaml.load(f, Loader=SafeLoader)
+    
+    try:
+        _CONFIG_ADAPTER.validate_python(config)
+    except ValidationError as e:
+        raise ValueError(f"Invalid config {path_str}: {e}") from e
+    return config
+
 
 @dataclass
 class PipelineMetrics:
@@ -38,10 +118,15 @@ class PipelineMetrics:
             self.errors = []
     
     def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data['start_time'] = self.start_time.isoformat()
+        data = {
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'articles_scraped': self.articles_scraped,
+            'articles_summarized': self.articles_summarized,
+            'articles_published': self.articles_published,
+            'errors': list(self.errors)
+        }
         if self.end_time:
-            data['end_time'] = self.end_time.isoformat()
             data['duration_seconds'] = (self.end_time - self.start_time).total_seconds()
         return data
 
@@ -57,6 +142,9 @@ class NewsPipeline:
             ttl=86400 * 7  # 7 days
         )
         
+        # Bloom filter in front of the cache for cheap negative lookups
+        self.article_bloom = BloomFilter(capacity=BLOOM_CAPACITY, error_rate=0.001)
+        
         # Load cache from disk if exists
         self._load_cache()
         
@@ -65,6 +153,16 @@ class NewsPipeline:
         self.rss_parser = None
         self.summarizer = None
         self.publishers = {}
+        self._markdown_publisher = None
+        
+        # Newsletter title + insights, requested while later batches are still summarizing
+        self._newsletter_meta = None
+        
+        # Dagger session, opened on first run and kept for later scheduled runs;
+        # DAGGER=0 runs everything in-process without connecting to the engine
+        self.use_dagger = os.environ.get('DAGGER', '1') == '1'
+        self._dagger_stack = None
+        self._dagger_client = None
         
         # Metrics
         self.metrics = None
@@ -74,8 +172,14 @@ class NewsPipeline:
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
-        with open(self.config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # Copy so per-instance overrides never leak into the shared cached parse
+        config = copy.deepcopy(
+            _parse_yaml(str(self.config_path), self.config_path.stat().st_mtime_ns)
+        )
+        
+        # Sections the pipeline indexes directly
+        config.setdefault('sources', {})
+        config.setdefault('publishing', {})
         
         # Set up environment variables for API keys
         # API key should be set in environment or .env file
@@ -84,160 +188,232 @@ class NewsPipeline:
     
     def _load_cache(self):
         """Load article cache from disk."""
-        cache_file = Path("cache/article_cache.json")
-        if cache_file.exists():
+        cache_file = Path("cache/article_cache.msgpack")
+        legacy_file = cache_file.with_suffix('.json')
+        migrate = False
+        
+        try:
+            if cache_file.exists():
+                cache_data = msgpack.unpackb(cache_file.read_bytes(), raw=False)
+            elif legacy_file.exists():
+                # One-time migration from the old JSON cache
+                cache_data = orjson.loads(legacy_file.read_bytes())
+                migrate = True
+            else:
+                cache_data = {}
+            
+            for key, value in cache_data.items():
+                # Older caches stored hex digests as string keys
+                if isinstance(key, str):
+                    key = bytes.fromhex(key)
+                self.article_cache[key] = value
+        except Exception as e:
+            logger.warning(f"Failed to load cache: {e}")
+        
+        self._load_bloom()
+        
+        if migrate:
+            self._save_cache()
+            if cache_file.exists():
+                legacy_file.unlink()
+    
+    def _load_bloom(self):
+        """Load the bloom filter saved alongside the cache, or rebuild it."""
+        bloom_file = Path("cache/article_bloom.bin")
+        if bloom_file.exists():
             try:
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-                    for key, value in cache_data.items():
-                        self.article_cache[key] = value
+                with open(bloom_file, 'rb') as f:
+                    bloom = BloomFilter.fromfile(f)
+                # Only trust the saved filter if it still covers every cached hash
+                if all(key in bloom for key in self.article_cache.keys()):
+                    self.article_bloom = bloom
+                    return
             except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
+                logger.warning(f"Failed to load bloom filter: {e}")
+        
+        self._rebuild_bloom()
+    
+    def _rebuild_bloom(self):
+        """Rebuild the bloom filter from the current cache keys."""
+        self.article_bloom = BloomFilter(capacity=BLOOM_CAPACITY, error_rate=0.001)
+        for key in self.article_cache.keys():
+            self.article_bloom.add(key)
     
     def _save_cache(self):
         """Save article cache to disk."""
-        cache_file = Path("cache/article_cache.json")
+        cache_file = Path("cache/article_cache.msgpack")
         cache_file.parent.mkdir(exist_ok=True)
         
         try:
             cache_data = dict(self.article_cache)
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f)
+            
+            # Write to a temp file and swap it in so a crash never leaves a torn cache
+            tmp_file = cache_file.with_suffix('.tmp')
+            tmp_file.write_bytes(msgpack.packb(cache_data, use_bin_type=True))
+            os.replace(tmp_file, cache_file)
+            
+            bloom_file = cache_file.with_name("article_bloom.bin")
+            tmp_file = bloom_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                self.article_bloom.tofile(f)
+            os.replace(tmp_file, bloom_file)
         except Exception as e:
             logger.warning(f"Failed to save cache: {e}")
     
-    def _get_article_hash(self, article: Article) -> str:
+    def _get_article_hash(self, article: Article) -> bytes:
         """Generate unique hash for article."""
-        content = f"{article.title}:{article.source_url}:{article.content[:200]}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return article.content_hash
     
-    def _deduplicate_articles(self, articles: List[Article]) -> List[Article]:
-        """Remove duplicate articles based on content similarity."""
-        unique_articles = []
-        
-        for article in articles:
-            article_hash = self._get_article_hash(article)
-            
-            if article_hash not in self.article_cache:
-                self.article_cache[article_hash] = {
-                    'title': article.title,
-                    'date': datetime.now().isoformat()
-                }
-                unique_articles.append(article)
-            else:
-                logger.info(f"Skipping duplicate article: {article.title}")
-        
-        return unique_articles
+    def _is_new(self, article: Article) -> bool:
+        """Check an article against the dedup cache, recording it if unseen."""
+        article_hash = self._get_article_hash(article)
+        
+        # A bloom miss means the article is definitely new
+        if article_hash in self.article_bloom and article_hash in self.article_cache:
+            logger.info(f"Skipping duplicate article: {article.title}")
+            return False
+        
+        self.article_cache[article_hash] = {
+            'title': article.title,
+            'date': datetime.now().isoformat()
+        }
+        try:
+            self.article_bloom.add(article_hash)
+        except IndexError:
+            # Filter is at capacity - start over from the live cache keys
+            self._rebuild_bloom()
+        return True
     
-    async def _scrape_articles_container(self, client: dagger.Client) -> List[Article]:
-        """Run article scraping in Dagger container."""
+    async def _scrape_articles_container(self, client: Optional[dagger.Client]) -> AsyncIterator[Article]:
+        """Scrape all configured sources, yielding unique articles as each source completes."""
         logger.info("Starting article scraping...")
         
-        # Create container with Python and dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["apt-get", "update"])
-            .with_exec(["apt-get", "install", "-y", "git"])
-            .with_exec(["pip", "install", "httpx", "beautifulsoup4", "lxml", 
-                       "feedparser", "python-dateutil", "tenacity"])
-        )
-        
-        # Mount source code
-        src_dir = client.host().directory("./src")
-        container = container.with_directory("/app/src", src_dir)
-        container = container.with_workdir("/app")
-        
-        # Run scraping
-        all_articles = []
-        
-        # Web scraping
-        if self.config['sources'].get('web_scraping'):
-            async with WebScraper(self.config) as scraper:
-                web_articles = await scraper.scrape_all_sources(
-                    self.config['sources']['web_scraping']
+        async with AsyncExitStack() as stack:
+            tasks = []
+            
+            # One pooled HTTP client shared by every scraper and feed parser
+            http_client = await stack.enter_async_context(httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=self.config.get('timeout', 30),
+                follow_redirects=True
+            ))
+            
+            # Web scraping - one task per source
+            if self.config['sources'].get('web_scraping'):
+                scraper = await stack.enter_async_context(WebScraper(self.config, http_client))
+                tasks.extend(
+                    asyncio.create_task(scraper.scrape_source(source, self._is_new))
+                    for source in self.config['sources']['web_scraping']
                 )
-                all_articles.extend(web_articles)
-        
-        # RSS parsing
-        if self.config['sources'].get('rss_feeds'):
-            parser = RSSParser(self.config)
-            rss_articles = await parser.parse_all_feeds(
-                self.config['sources']['rss_feeds']
-            )
-            all_articles.extend(rss_articles)
-        
-        # Deduplicate
-        unique_articles = self._deduplicate_articles(all_articles)
-        
-        logger.info(f"Scraped {len(unique_articles)} unique articles")
-        return unique_articles
+            
+            # RSS parsing - one task per feed
+            if self.config['sources'].get('rss_feeds'):
+                parser = RSSParser(self.config, http_client)
+                # Persists the feed ETag cache; the shared client stays open
+                stack.push_async_callback(parser.aclose)
+                tasks.extend(
+                    asyncio.create_task(parser.parse_feed(feed_config, self._is_new))
+                    for feed_config in self.config['sources']['rss_feeds']
+                )
+            
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    try:
+                        articles = await next_result
+                    except Exception as e:
+                        logger.error(f"Source scraping failed: {e}")
+                        continue
+                    
+                    # Duplicates were already dropped as each article arrived
+                    for article in articles:
+                        yield article
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    async def _produce_articles(self, client: Optional[dagger.Client], queue: asyncio.Queue):
+        """Feed scraped articles into the queue, terminated by a None sentinel."""
+        cancelled = False
+        try:
+            async for article in self._scrape_articles_container(client):
+                self.metrics.articles_scraped += 1
+                await queue.put(article)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Cancelled means the consumer is gone; a put into a full queue would never return
+            if not cancelled:
+                await queue.put(None)
+            logger.info(f"Scraped {self.metrics.articles_scraped} unique articles")
     
-    async def _summarize_articles_container(self, client: dagger.Client, 
-                                          articles: List[Article]) -> List[Tuple[Dict[str, Any], Summary]]:
-        """Run article summarization in Dagger container."""
+    async def _summarize_articles_container(self, client: Optional[dagger.Client], 
+                                          queue: asyncio.Queue) -> List[Tuple[Dict[str, Any], 'Summary']]:
+        """Summarize articles in batches as they arrive on the queue."""
         logger.info("Starting article summarization...")
         
-        # Create container with AI dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["pip", "install", "openai", "anthropic", "tiktoken", "tenacity"])
-            .with_env_variable("ANTHROPIC_API_KEY", os.environ.get("ANTHROPIC_API_KEY", ""))
-            .with_env_variable("OPENAI_API_KEY", os.environ.get("OPENAI_API_KEY", ""))
-        )
-        
-        # Mount source code
-        src_dir = client.host().directory("./src")
-        container = container.with_directory("/app/src", src_dir)
-        container = container.with_workdir("/app")
-        
         # Configure summarizer for Anthropic Claude
         summarizer_config = self.config.get('summarization', {})
         summarizer_config['provider'] = 'anthropic'
         summarizer_config['model'] = 'claude-3-opus-20240229'
         summarizer_config['api_key_env'] = 'ANTHROPIC_API_KEY'
         
-        summarizer = GPTSummarizer(summarizer_config)
+        # Created on the first batch so runs without new articles never load the AI SDKs
+        summarizer = None
         
         # Limit articles if configured
         max_articles = self.config.get('summarization', {}).get('max_articles_per_run', 20)
-        articles_to_process = articles[:max_articles]
+        batch_size = max(1, max_articles // 4)
         
-        # Convert articles to dicts for processing
-        article_dicts = [article.to_dict() for article in articles_to_process]
+        summaries = []
+        pending = []
+        accepted = 0
+        finished = False
         
-        # Process articles
-        summaries = await summarizer.process_articles(article_dicts, max_articles)
+        while not finished:
+            flush = False
+            try:
+                article = await asyncio.wait_for(queue.get(), timeout=SUMMARY_BATCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Scraping is still running - summarize what we have so far
+                flush = True
+            else:
+                if article is None:
+                    finished = flush = True
+                elif accepted < max_articles:
+                    pending.append(article)
+                    accepted += 1
+                    flush = len(pending) >= batch_size
+            
+            if flush and pending:
+                if summarizer is None:
+                    from src.summarizers import GPTSummarizer
+                    summarizer = GPTSummarizer(summarizer_config)
+                
+                # Hand the batch over as columns rather than one dict per article
+                article_columns = Article.to_columns(pending)
+                pending = []
+                
+                # Process articles; only the newsletter's top stories need full summaries
+                full_count = max(0, summarizer.NEWSLETTER_STORIES - len(summaries))
+                summaries.extend(await summarizer.process_articles(article_columns, full_count=full_count))
+                
+                # The newsletter's top stories are settled; start on its title and insights
+                if self._newsletter_meta is None and len(summaries) >= summarizer.NEWSLETTER_STORIES:
+                    self._newsletter_meta = asyncio.create_task(summarizer.generate_newsletter_meta(
+                        summaries[:summarizer.NEWSLETTER_STORIES], self.config.get('niche', 'News')
+                    ))
         
         logger.info(f"Summarized {len(summaries)} articles")
         return summaries
     
-    async def _publish_content_container(self, client: dagger.Client,
-                                       summaries: List[Tuple[Dict[str, Any], Summary]],
+    async def _publish_content_container(self, client: Optional[dagger.Client],
+                                       summaries: List[Tuple[Dict[str, Any], 'Summary']],
                                        niche: str) -> List[str]:
-        """Run content publishing in Dagger container."""
+        """Publish newsletter and article content with each enabled publisher."""
         logger.info("Starting content publishing...")
         
-        # Create container with publishing dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["apt-get", "update"])
-            .with_exec(["apt-get", "install", "-y", "git"])
-            .with_exec(["pip", "install", "jinja2", "tweepy", "pygithub", "gitpython"])
-        )
-        
-        # Mount source code and templates
-        src_dir = client.host().directory("./src")
-        container = container.with_directory("/app/src", src_dir)
-        
-        if Path("./templates").exists():
-            templates_dir = client.host().directory("./templates")
-            container = container.with_directory("/app/templates", templates_dir)
-        
-        container = container.with_workdir("/app")
-        
         published_files = []
         
         # Initialize publishers
@@ -245,16 +421,22 @@ class NewsPipeline:
         
         # Markdown publisher
         if self.config['publishing'].get('markdown', {}).get('enabled', True):
-            markdown_config = self.config['publishing']['markdown']
-            markdown_config['template_dir'] = './templates'
-            publishers['markdown'] = MarkdownPublisher(markdown_config)
+            # Reused across runs so its template environment is only built once
+            if self._markdown_publisher is None:
+                markdown_config = self.config['publishing']['markdown']
+                markdown_config['template_dir'] = './templates'
+                from src.publishers import MarkdownPublisher
+                self._markdown_publisher = MarkdownPublisher(markdown_config)
+            publishers['markdown'] = self._markdown_publisher
         
         # Twitter publisher
         if self.config['publishing'].get('twitter', {}).get('enabled', False):
+            from src.publishers import TwitterPublisher
             publishers['twitter'] = TwitterPublisher(self.config['publishing']['twitter'])
         
         # GitHub publisher
         if self.config['publishing'].get('github', {}).get('enabled', False):
+            from src.publishers import GitHubPublisher
             publishers['github'] = GitHubPublisher(self.config['publishing']['github'])
         
         # Generate newsletter content
@@ -263,8 +445,16 @@ class NewsPipeline:
         summarizer_config['model'] = 'claude-3-opus-20240229'
         summarizer_config['api_key_env'] = 'ANTHROPIC_API_KEY'
         
+        from src.summarizers import GPTSummarizer
         summarizer = GPTSummarizer(summarizer_config)
-        newsletter_content = await summarizer.create_newsletter_content(summaries, niche)
+        meta = None
+        if self._newsletter_meta is not None:
+            try:
+                meta = await self._newsletter_meta
+            except Exception as e:
+                logger.warning(f"Early newsletter title/insights failed, retrying: {e}")
+            self._newsletter_meta = None
+        newsletter_content = await summarizer.create_newsletter_content(summaries, niche, meta)
         
         # Publish with each publisher
         if 'markdown' in publishers:
@@ -277,30 +467,35 @@ class NewsPipeline:
                 for article, summary in summaries
             ]
             
-            filepath = publishers['markdown'].publish_newsletter(
-                newsletter_content.to_dict(),
-                all_articles_data,
-                {'niche': niche}
-            )
-            published_files.append(filepath)
-            
-            # Publish individual articles
-            for article, summary in summaries[:5]:  # Top 5 articles
-                article_path = publishers['markdown'].publish_article(
-                    article,
-                    summary.to_dict()
+            # Write the newsletter and top 5 articles concurrently off the event loop
+            markdown = publishers['markdown']
+            paths = await asyncio.gather(
+                asyncio.to_thread(
+                    markdown.publish_newsletter,
+                    newsletter_content.to_dict(),
+                    all_articles_data,
+                    {'niche': niche}
+                ),
+                *(
+                    asyncio.to_thread(markdown.publish_article, article, summary.to_dict())
+                    for article, summary in summaries[:5]
                 )
-                published_files.append(article_path)
+            )
+            published_files.extend(paths)
             
             # Generate index
-            index_path = publishers['markdown'].generate_index(published_files)
+            index_path = await asyncio.to_thread(publishers['markdown'].generate_index, published_files)
             published_files.append(index_path)
         
         if 'twitter' in publishers:
-            await publishers['twitter'].publish_newsletter_thread(
-                newsletter_content.to_dict(),
-                [article for article, _ in summaries]
-            )
+            twitter = publishers['twitter']
+            try:
+                await twitter.publish_newsletter_thread(
+                    newsletter_content.to_dict(),
+                    [article for article, _ in summaries]
+                )
+            finally:
+                await twitter.aclose()
         
         if 'github' in publishers:
             await publishers['github'].publish_to_github(
@@ -311,54 +506,85 @@ class NewsPipeline:
         logger.info(f"Published {len(published_files)} files")
         return published_files
     
+    async def _get_dagger_client(self) -> dagger.Client:
+        """Connect to the Dagger engine once and reuse the session across runs."""
+        if self._dagger_client is None:
+            stack = AsyncExitStack()
+            self._dagger_client = await stack.enter_async_context(await dagger.connect())
+            self._dagger_stack = stack
+        return self._dagger_client
+    
+    async def close(self):
+        """Shut down the cached Dagger session and the shared LLM API clients."""
+        if 'src.summarizers' in sys.modules:
+            from src.summarizers import close_clients
+            await close_clients()
+        
+        if self._dagger_stack is not None:
+            stack = self._dagger_stack
+            self._dagger_stack = None
+            self._dagger_client = None
+            await stack.aclose()
+    
     async def run_pipeline(self) -> PipelineMetrics:
         """Run the complete news summarization pipeline."""
         self.metrics = PipelineMetrics(start_time=datetime.now())
+        self._newsletter_meta = None
         
         try:
-            async with await dagger.connect() as client:
-                # 1. Scrape articles
-                articles = await self._scrape_articles_container(client)
-                self.metrics.articles_scraped = len(articles)
-                
-                if not articles:
-                    logger.warning("No articles found to process")
-                    self.metrics.end_time = datetime.now()
-                    return self.metrics
-                
-                # 2. Summarize articles
-                summaries = await self._summarize_articles_container(client, articles)
-                self.metrics.articles_summarized = len(summaries)
-                
-                if not summaries:
-                    logger.warning("No articles were summarized")
-                    self.metrics.end_time = datetime.now()
-                    return self.metrics
-                
-                # 3. Publish content
-                niche = self.config.get('niche', 'News')
-                published_files = await self._publish_content_container(client, summaries, niche)
-                self.metrics.articles_published = len(published_files)
-                
-                # Save cache
-                self._save_cache()
-                
+            client = await self._get_dagger_client() if self.use_dagger else None
+            
+            # 1 + 2. Scrape and summarize articles concurrently
+            queue = asyncio.Queue(maxsize=32)
+            producer = asyncio.create_task(self._produce_articles(client, queue))
+            try:
+                summaries = await self._summarize_articles_container(client, queue)
+            except BaseException:
+                # Nothing drains the queue any more; don't leave scraping blocked on it
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+                raise
+            await producer
+            self.metrics.articles_summarized = len(summaries)
+            
+            if not self.metrics.articles_scraped:
+                logger.warning("No articles found to process")
                 self.metrics.end_time = datetime.now()
-                
-                # Log metrics
-                logger.info(f"Pipeline completed successfully!")
-                logger.info(f"Metrics: {json.dumps(self.metrics.to_dict(), indent=2)}")
-                
                 return self.metrics
-                
+            
+            if not summaries:
+                logger.warning("No articles were summarized")
+                self.metrics.end_time = datetime.now()
+                return self.metrics
+            
+            # 3. Publish content
+            niche = self.config.get('niche', 'News')
+            published_files = await self._publish_content_container(client, summaries, niche)
+            self.metrics.articles_published = len(published_files)
+            
+            # Save cache
+            await asyncio.to_thread(self._save_cache)
+            
+            self.metrics.end_time = datetime.now()
+            
+            # Log metrics
+            logger.info(f"Pipeline completed successfully!")
+            logger.info(f"Metrics: {orjson.dumps(self.metrics.to_dict(), option=orjson.OPT_INDENT_2).decode()}")
+            
+            return self.metrics
+            
         except Exception as e:
             logger.error(f"Pipeline failed: {e}")
+            if self._newsletter_meta is not None:
+                self._newsletter_meta.cancel()
+                self._newsletter_meta = None
             self.metrics.errors.append(str(e))
             self.metrics.end_time = datetime.now()
             
             # Create error report if GitHub publisher is enabled
             if self.config['publishing'].get('github', {}).get('enabled', False):
                 try:
+                    from src.publishers import GitHubPublisher
                     github_publisher = GitHubPublisher(self.config['publishing']['github'])
                     await github_publisher.create_issue_for_errors(
                         self.metrics.errors,
@@ -377,34 +603,42 @@ class NewsPipeline:
         
         logger.info(f"Starting scheduled pipeline: {frequency} at {run_time}")
         
+        hour, minute = map(int, run_time.split(':'))
+        last_run = None
+        
         while True:
             now = datetime.now()
-            
-            # Parse run time
-            hour, minute = map(int, run_time.split(':'))
             next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
             
-            # If time has passed today, schedule for tomorrow
-            if now > next_run:
-                next_run += timedelta(days=1)
+            if frequency == 'weekly':
+                # Weekly runs fire on Mondays
+                next_run += timedelta(days=(7 - now.weekday()) % 7)
+            
+            # If the slot has passed (or already ran), move to the next one
+            step = timedelta(days=7 if frequency == 'weekly' else 1)
+            while next_run <= now or (last_run and next_run <= last_run):
+                next_run += step
             
-            # Wait until next run
+            # Wait until next run (asyncio.sleep runs on the monotonic loop clock)
             wait_seconds = (next_run - now).total_seconds()
             logger.info(f"Next run scheduled for {next_run} ({wait_seconds/3600:.1f} hours)")
             
             await asyncio.sleep(wait_seconds)
+            last_run = next_run
             
-            # Run pipeline
+            # Run pipeline; shielded so a shutdown lets the current run finish saving its cache
+            run = asyncio.ensure_future(self.run_pipeline())
             try:
-                await self.run_pipeline()
+                await asyncio.shield(run)
+            except asyncio.CancelledError:
+                logger.warning("Shutdown requested - waiting for the current run to finish")
+                try:
+                    await run
+                except Exception as e:
+                    logger.error(f"Scheduled run failed: {e}")
+                raise
             except Exception as e:
                 logger.error(f"Scheduled run failed: {e}")
-            
-            # Wait for next interval
-            if frequency == 'weekly':
-                await asyncio.sleep(86400 * 7)  # 7 days
-            else:  # daily
-                await asyncio.sleep(60)  # Small delay to avoid immediate re-run
 
 
 async def main():
@@ -422,15 +656,28 @@ async def main():
     pipeline = NewsPipeline(args.config)
     
     if args.preview:
-        pipeline.config['publishing']['twitter']['enabled'] = False
-        pipeline.config['publishing']['github']['enabled'] = False
+        publishing = pipeline.config.setdefault('publishing', {})
+        publishing.setdefault('twitter', {})['enabled'] = False
+        publishing.setdefault('github', {})['enabled'] = False
         logger.info("Running in preview mode - publishing disabled")
     
-    if args.scheduled:
-        await pipeline.run_scheduled()
-    else:
-        await pipeline.run_pipeline()
+    try:
+        if args.scheduled:
+            await pipeline.run_scheduled()
+        else:
+            await pipeline.run_pipeline()
+    finally:
+        await pipeline.close()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    # libuv-backed event loop where available (Linux/macOS)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
\ No newline at end of file
@@ -1,5 +1,17 @@
-from .markdown_publisher import MarkdownPublisher
-from .twitter_publisher import TwitterPublisher
-from .github_publisher import GitHubPublisher
+import importlib
 
-__all__ = ['MarkdownPublisher', 'TwitterPublisher', 'GitHubPublisher']
\ No newline at end of file
+_PUBLISHER_MODULES = {
+    'MarkdownPublisher': '.markdown_publisher',
+    'TwitterPublisher': '.twitter_publisher',
+    'GitHubPublisher': '.github_publisher',
+}
+
+__all__ = ['MarkdownPublisher', 'TwitterPublisher', 'GitHubPublisher']
+
+
+def __getattr__(name):
+    # Import publishers on first access so unused ones never load their SDKs
+    if name in _PUBLISHER_MODULES:
+        module = importlib.import_module(_PUBLISHER_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
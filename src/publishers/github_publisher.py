@@ -3,15 +3,48 @@ import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import subprocess
 import asyncio
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
 
-from github import Github, GithubException
-import git
+import httpx
+import orjson
+import pygit2
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds before cached GitHub Pages info is refreshed from the API
+PAGES_CACHE_TTL = 86400
+
+GITHUB_API_URL = 'https://api.github.com'
+GITHUB_GRAPHQL_URL = f'{GITHUB_API_URL}/graphql'
+
+REPO_METADATA_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    url
+    hasIssuesEnabled
+    ghPages: ref(qualifiedName: "refs/heads/gh-pages") { name }
+    cname: object(expression: "HEAD:CNAME") { ... on Blob { text } }
+  }
+}
+"""
+
+
+class PublishCallbacks(pygit2.RemoteCallbacks):
+    """Remote callbacks that record refs the server refused during a push."""
+    
+    def __init__(self, credentials=None):
+        super().__init__(credentials=credentials)
+        self.rejected = {}
+    
+    def push_update_reference(self, refname, message):
+        # libgit2 reports server-side rejections here rather than raising
+        if message:
+            self.rejected[refname] = message
+
 
 class GitHubPublisher:
     def __init__(self, config: Dict[str, Any]):
@@ -19,46 +52,107 @@ class GitHubPublisher:
         self.enabled = config.get('enabled', False)
         
         if self.enabled:
-            # Initialize GitHub client
             token = os.getenv(config.get('token_env', 'GITHUB_TOKEN'))
             if not token:
                 raise ValueError("GitHub token not found in environment")
             
-            self.github = Github(token)
+            self._token = token
             self.repo_name = config['repo']
             self.branch = config.get('branch', 'main')
             self.local_repo_path = Path(config.get('local_repo_path', './github_repo'))
+            self._pages_cache = None
             
-            # Setup repository
-            self._setup_repository()
+            # Seconds a clone/pull/push stays fresh enough to publish on top of
+            self.sync_interval = config.get('sync_interval', 60)
+            self._last_sync_ts = 0.0
+            
+            # Cloned/pulled on first publish, so unused publishers cost nothing
+            self.git_repo = None
     
     def _setup_repository(self):
         """Setup local repository for publishing."""
         try:
-            # Get repository
-            self.repo = self.github.get_repo(self.repo_name)
+            self._callbacks = PublishCallbacks(
+                credentials=pygit2.UserPass('x-access-token', self._token)
+            )
             
             # Clone or pull repository
             if self.local_repo_path.exists() and (self.local_repo_path / '.git').exists():
                 # Pull latest changes
-                self.git_repo = git.Repo(self.local_repo_path)
-                origin = self.git_repo.remote('origin')
-                origin.pull(self.branch)
+                self.git_repo = pygit2.Repository(str(self.local_repo_path))
+                self._pull()
                 logger.info(f"Pulled latest changes from {self.repo_name}")
             else:
-                # Clone repository
+                # Shallow clone of the publish branch only
                 self.local_repo_path.mkdir(parents=True, exist_ok=True)
-                self.git_repo = git.Repo.clone_from(
-                    self.repo.clone_url.replace('https://', f'https://x-access-token:{os.getenv(self.config.get("token_env", "GITHUB_TOKEN"))}@'),
-                    self.local_repo_path,
-                    branch=self.branch
+                self.git_repo = pygit2.clone_repository(
+                    f"{self._repo_meta['url']}.git",
+                    str(self.local_repo_path),
+                    checkout_branch=self.branch,
+                    callbacks=self._callbacks,
+                    depth=1
                 )
+                self._last_sync_ts = time.monotonic()
                 logger.info(f"Cloned repository {self.repo_name}")
                 
         except Exception as e:
             logger.error(f"Error setting up repository: {e}")
             raise
     
+    def _ensure_setup(self):
+        """Clone or pull the publish repository the first time it is needed."""
+        if self.git_repo is None:
+            self._setup_repository()
+    
+    @cached_property
+    def _repo_meta(self) -> Dict[str, Any]:
+        """Repository metadata, fetched in a single GraphQL round-trip on first use."""
+        return self._fetch_repo_metadata()
+    
+    def _fetch_repo_metadata(self) -> Dict[str, Any]:
+        """Fetch the repository fields the publisher needs with one GraphQL query."""
+        owner, name = self.repo_name.split('/')
+        response = httpx.post(
+            GITHUB_GRAPHQL_URL,
+            content=orjson.dumps({'query': REPO_METADATA_QUERY, 'variables': {'owner': owner, 'name': name}}),
+            headers={'Authorization': f'Bearer {self._token}', 'Content-Type': 'application/json'},
+            timeout=30
+        )
+        response.raise_for_status()
+        
+        payload = orjson.loads(response.content)
+        if payload.get('errors') or not payload.get('data', {}).get('repository'):
+            raise ValueError(f"GitHub GraphQL query failed: {payload.get('errors')}")
+        return payload['data']['repository']
+    
+    def _api_headers(self) -> Dict[str, str]:
+        """Headers for GitHub REST API requests."""
+        return {
+            'Authorization': f'Bearer {self._token}',
+            'Accept': 'application/vnd.github+json',
+            'Content-Type': 'application/json'
+        }
+    
+    def _pull(self):
+        """Shallow-fetch the publish branch and hard-reset the local branch onto it."""
+        # Publishing only needs the branch tip, so skip history and other refs
+        self.git_repo.remotes['origin'].fetch(
+            [f'+refs/heads/{self.branch}:refs/remotes/origin/{self.branch}'],
+            callbacks=self._callbacks,
+            depth=1
+        )
+        
+        remote_id = self.git_repo.lookup_reference(f'refs/remotes/origin/{self.branch}').target
+        self.git_repo.reset(remote_id, pygit2.GIT_RESET_HARD)
+        self._last_sync_ts = time.monotonic()
+    
+    def _signature(self) -> pygit2.Signature:
+        """Commit author from git config, falling back to a bot identity."""
+        try:
+            return self.git_repo.default_signature
+        except KeyError:
+            return pygit2.Signature('AI News Summarizer', 'ai-news-summarizer@users.noreply.github.com')
+    
     def _prepare_content_directory(self) -> Path:
         """Prepare directory structure for content."""
         # Create directory structure
@@ -72,13 +166,13 @@ class GitHubPublisher:
         
         return content_dir
     
-    def _generate_index_page(self, content_dir: Path) -> str:
+    def _generate_index_page(self, content_dir: Path, now: datetime) -> str:
         """Generate or update the main index page."""
         index_content = f"""# AI News Digest
 
 *Automatically updated by AI News Summarizer*
 
-Last updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p UTC')}
+Last updated: {now.strftime('%B %d, %Y at %I:%M %p UTC')}
 
 ## Latest Newsletter
 
@@ -102,41 +196,73 @@ This repository contains AI-generated summaries of news articles, automatically
 """
         
         index_path = self.local_repo_path / 'README.md'
-        index_path.write_text(index_content, encoding='utf-8')
+        index_path.write_bytes(index_content.encode('utf-8'))
         
         return str(index_path)
     
+    def _copy_one(self, source_file: str, content_dir: Path) -> List[str]:
+        """Copy a single content file, returning the repo-relative paths written."""
+        source_path = Path(source_file)
+        
+        if not source_path.exists():
+            logger.warning(f"Source file not found: {source_file}")
+            return []
+        
+        # Determine destination
+        if 'articles' in source_path.parts:
+            dest_dir = content_dir / 'articles'
+        else:
+            dest_dir = content_dir / 'newsletters'
+        
+        dest_path = dest_dir / source_path.name
+        
+        # Copy file (kernel-side copy via sendfile where available)
+        shutil.copyfile(source_path, dest_path)
+        return [str(dest_path.relative_to(self.local_repo_path))]
+    
     def _copy_content_files(self, source_files: List[str], content_dir: Path) -> List[str]:
         """Copy content files to repository."""
         copied_files = []
+        if not source_files:
+            return copied_files
         
+        # Copies are independent and I/O-bound, so overlap them in a thread pool
+        with ThreadPoolExecutor(max_workers=min(32, len(source_files))) as executor:
+            futures = [
+                executor.submit(self._copy_one, source_file, content_dir)
+                for source_file in source_files
+            ]
+            for future in as_completed(futures):
+                copied_files.extend(future.result())
+        
+        # Point latest.md at this run's newsletter, once all copies are done
         for source_file in source_files:
             source_path = Path(source_file)
-            
-            if not source_path.exists():
-                logger.warning(f"Source file not found: {source_file}")
+            if ('articles' in source_path.parts or source_path.name in ('index.md', 'latest.md')
+                    or not source_path.exists()):
                 continue
-            
-            # Determine destination
-            if 'articles' in source_path.parts:
-                dest_dir = content_dir / 'articles'
-            else:
-                dest_dir = content_dir / 'newsletters'
-            
-            dest_path = dest_dir / source_path.name
-            
-            # Copy file
-            dest_path.write_text(source_path.read_text(encoding='utf-8'), encoding='utf-8')
-            copied_files.append(str(dest_path.relative_to(self.local_repo_path)))
-            
-            # Update latest symlink for newsletters
-            if 'newsletters' in str(dest_path) and source_path.name != 'latest.md':
-                latest_path = dest_dir / 'latest.md'
-                latest_path.write_text(source_path.read_text(encoding='utf-8'), encoding='utf-8')
-                copied_files.append(str(latest_path.relative_to(self.local_repo_path)))
+            newsletters_dir = content_dir / 'newsletters'
+            latest_path = newsletters_dir / 'latest.md'
+            shutil.copyfile(newsletters_dir / source_path.name, latest_path)
+            latest_file = str(latest_path.relative_to(self.local_repo_path))
+            if latest_file not in copied_files:
+                copied_files.append(latest_file)
+            break
         
         return copied_files
     
+    def _has_staged_changes(self, head_tree: pygit2.Tree, paths: List[str]) -> bool:
+        """Whether any of the staged paths differs from HEAD."""
+        index = self.git_repo.index
+        for path in paths:
+            try:
+                if index[path].id != head_tree[path].id:
+                    return True
+            except KeyError:
+                # New file, not in HEAD yet
+                return True
+        return False
+    
     async def publish_to_github(self, content_files: List[str], 
                                commit_message: Optional[str] = None) -> bool:
         """Publish content files to GitHub repository."""
@@ -144,10 +270,20 @@ This repository contains AI-generated summaries of news articles, automatically
             logger.info("GitHub publishing is disabled")
             return False
         
+        # Git work is blocking (disk and network), keep it off the event loop
+        return await asyncio.to_thread(self._publish, content_files, commit_message)
+    
+    def _publish(self, content_files: List[str], commit_message: Optional[str]) -> bool:
+        """Copy, commit and push content files; runs in a worker thread."""
         try:
-            # Pull latest changes
-            origin = self.git_repo.remote('origin')
-            origin.pull(self.branch)
+            # One timestamp for the index page and commit message
+            now = datetime.now()
+            
+            self._ensure_setup()
+            
+            # Pull latest changes unless we synced moments ago (sole writer to the branch)
+            if time.monotonic() - self._last_sync_ts > self.sync_interval:
+                self._pull()
             
             # Prepare content directory
             content_dir = self._prepare_content_directory()
@@ -160,25 +296,39 @@ This repository contains AI-generated summaries of news articles, automatically
                 return False
             
             # Generate/update index
-            index_file = self._generate_index_page(content_dir)
+            index_file = self._generate_index_page(content_dir, now)
             copied_files.append('README.md')
             
             # Stage files
-            self.git_repo.index.add(copied_files)
+            index = self.git_repo.index
+            index.add_all(copied_files)
+            index.write()
             
-            # Check if there are changes
-            if not self.git_repo.index.diff("HEAD"):
+            # Check if there are changes; only the files we just staged can differ
+            head_commit = self.git_repo.head.peel(pygit2.Commit)
+            if not self._has_staged_changes(head_commit.tree, copied_files):
                 logger.info("No changes to commit")
                 return True
             
+            tree_id = index.write_tree()
+            
             # Commit
             if not commit_message:
-                commit_message = f"Update news digest - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                commit_message = f"Update news digest - {now.strftime('%Y-%m-%d %H:%M')}"
             
-            self.git_repo.index.commit(commit_message)
+            signature = self._signature()
+            self.git_repo.create_commit(
+                'HEAD', signature, signature, commit_message, tree_id, [head_commit.id]
+            )
             
             # Push
-            origin.push(self.branch)
+            self._callbacks.rejected.clear()
+            self.git_repo.remotes['origin'].push(
+                [f'refs/heads/{self.branch}'], callbacks=self._callbacks
+            )
+            if self._callbacks.rejected:
+                raise RuntimeError(f"Push rejected: {self._callbacks.rejected}")
+            self._last_sync_ts = time.monotonic()
             
             logger.info(f"Successfully published {len(copied_files)} files to GitHub")
             
@@ -191,36 +341,75 @@ This repository contains AI-generated summaries of news articles, automatically
             
         except Exception as e:
             logger.error(f"Error publishing to GitHub: {e}")
+            # Local state may now differ from origin, so always pull next time
+            self._last_sync_ts = 0.0
             # Try to reset repository state
             try:
-                self.git_repo.git.reset('--hard', 'HEAD')
+                self.git_repo.reset(self.git_repo.head.target, pygit2.GIT_RESET_HARD)
             except:
                 pass
             return False
     
+    def _pages_info(self) -> Dict[str, Any]:
+        """GitHub Pages status and URL, cached in memory and on disk for a day."""
+        if self._pages_cache is not None:
+            return self._pages_cache
+        
+        # Kept inside .git so it can never be staged with the published content
+        cache_file = self.local_repo_path / '.git' / 'pages_cache.json'
+        try:
+            cached = orjson.loads(cache_file.read_bytes())
+            if cached['repo'] == self.repo_name and time.time() - cached['fetched_at'] < PAGES_CACHE_TTL:
+                self._pages_cache = cached
+                return cached
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        enabled = self._fetch_github_pages_enabled()
+        info = {
+            'repo': self.repo_name,
+            'fetched_at': time.time(),
+            'enabled': enabled,
+            'url': self._fetch_github_pages_url() if enabled else None
+        }
+        try:
+            cache_file.write_bytes(orjson.dumps(info))
+        except OSError as e:
+            logger.warning(f"Failed to cache GitHub Pages info: {e}")
+        
+        self._pages_cache = info
+        return info
+    
     def _is_github_pages_enabled(self) -> bool:
         """Check if GitHub Pages is enabled for the repository."""
-        try:
-            # Check if gh-pages branch exists or if Pages is configured
-            branches = [b.name for b in self.repo.get_branches()]
-            return 'gh-pages' in branches or self.branch in ['main', 'master']
-        except:
-            return False
+        return self._pages_info()['enabled']
     
-    def _get_github_pages_url(self) -> str:
+    def _get_github_pages_url(self) -> Optional[str]:
         """Get the GitHub Pages URL for the repository."""
+        return self._pages_info()['url']
+    
+    def _fetch_github_pages_enabled(self) -> bool:
+        """Check whether Pages is served from this repository."""
+        # Publishing to main/master needs no API call at all
+        if self.branch in ['main', 'master']:
+            return True
+        
+        return self._repo_meta.get('ghPages') is not None
+    
+    def _fetch_github_pages_url(self) -> str:
+        """Resolve the GitHub Pages URL, honouring a CNAME file."""
         owner, repo_name = self.repo_name.split('/')
         
         # Check for custom domain
-        try:
-            cname_content = self.repo.get_contents('CNAME').decoded_content.decode('utf-8').strip()
-            return f"https://{cname_content}"
-        except:
-            # Default GitHub Pages URL
-            if repo_name == f"{owner}.github.io":
-                return f"https://{owner}.github.io"
-            else:
-                return f"https://{owner}.github.io/{repo_name}"
+        cname = (self._repo_meta.get('cname') or {}).get('text', '').strip()
+        if cname:
+            return f"https://{cname}"
+        
+        # Default GitHub Pages URL
+        if repo_name == f"{owner}.github.io":
+            return f"https://{owner}.github.io"
+        else:
+            return f"https://{owner}.github.io/{repo_name}"
     
     async def setup_github_pages(self) -> bool:
         """Setup GitHub Pages for the repository."""
@@ -245,24 +434,36 @@ This repository contains AI-generated summaries of news articles, automatically
         if not self.enabled or not errors:
             return None
         
+        # Only consult metadata already fetched; otherwise the API rejects the POST itself
+        repo_meta = self.__dict__.get('_repo_meta', {})
+        if not repo_meta.get('hasIssuesEnabled', True):
+            logger.warning(f"Issues are disabled for {self.repo_name}, not reporting errors")
+            return None
+        
         try:
             if not title:
                 title = f"Newsletter Generation Errors - {datetime.now().strftime('%Y-%m-%d')}"
             
-            body = "The following errors were encountered during newsletter generation:\n\n"
-            for error in errors:
-                body += f"- {error}\n"
+            body = ''.join([
+                "The following errors were encountered during newsletter generation:\n\n",
+                *(f"- {error}\n" for error in errors),
+                "\n*This issue was automatically created by the AI News Summarizer*"
+            ])
             
-            body += "\n*This issue was automatically created by the AI News Summarizer*"
-            
-            issue = self.repo.create_issue(
-                title=title,
-                body=body,
-                labels=['automated', 'error-report']
-            )
+            async with httpx.AsyncClient(headers=self._api_headers(), timeout=30) as client:
+                response = await client.post(
+                    f"{GITHUB_API_URL}/repos/{self.repo_name}/issues",
+                    content=orjson.dumps({
+                        'title': title,
+                        'body': body,
+                        'labels': ['automated', 'error-report']
+                    })
+                )
+                response.raise_for_status()
             
-            logger.info(f"Created issue: {issue.html_url}")
-            return issue.html_url
+            issue_url = orjson.loads(response.content)['html_url']
+            logger.info(f"Created issue: {issue_url}")
+            return issue_url
             
         except Exception as e:
             logger.error(f"Error creating issue: {e}")
@@ -300,4 +501,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
\ No newline at end of file
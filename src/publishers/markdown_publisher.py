@@ -1,132 +1,181 @@
 import os
+import functools
 import logging
+import tempfile
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import re
 
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import Template, Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters that are invalid in filenames on common filesystems
+_FILENAME_TRANS = str.maketrans('', '', '<>:"/\\|?*')
+
+# Markdown for one article; compiled once per publisher
+ARTICLE_SECTION_TEMPLATE = (
+    "### {{ article.title }}\n\n"
+    "**Source:** [{{ article.source_name }}]({{ article.source_url }})\n"
+    "{% if article.author %}**Author:** {{ article.author }}\n{% endif %}"
+    "{% if article.date %}**Date:** {{ article.date }}\n{% endif %}"
+    "\n"
+    "**Summary:** {{ summary.short_summary }}\n\n"
+    "{% if summary.key_insights %}**Key Insights:**\n"
+    "{% for insight in summary.key_insights %}- {{ insight }}\n{% endfor %}"
+    "\n{% endif %}"
+    "{% if summary.tags %}**Tags:** {{ summary.tags | join(', ') }}\n{% endif %}"
+    "\n---\n\n"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _template_environment(template_dir: str, cache_dir: str) -> Environment:
+    """Jinja environment for a template directory, shared by every publisher in the process."""
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        bytecode_cache=FileSystemBytecodeCache(cache_dir, '%s.cache'),
+        auto_reload=False,
+        cache_size=-1
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _article_template() -> Template:
+    """The compiled article section template."""
+    return Environment(keep_trailing_newline=True).from_string(ARTICLE_SECTION_TEMPLATE)
+
+
+def _write_markdown(path: Path, content: str, fsync: bool = False):
+    """Write UTF-8 content atomically with unbuffered writes, syncing to disk only if asked."""
+    data = memoryview(content.encode('utf-8'))
+    # Unique temp name: concurrent writers may target the same path
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        try:
+            # mkstemp creates owner-only files; published output stays world-readable
+            os.fchmod(fd, 0o644)
+            while data:
+                data = data[os.write(fd, data):]
+            if fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
 
 class MarkdownPublisher:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.output_dir = Path(config.get('output_dir', './output'))
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Output can be regenerated, so by default the OS decides when it reaches disk
+        self.fsync = config.get('fsync', False)
         
-        # Setup Jinja2 environment
+        # Setup Jinja2 environment; compiled templates are cached on disk across runs
+        # and in memory across publishers
         template_dir = Path(config.get('template_dir', './templates'))
         if template_dir.exists():
-            self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+            cache_dir = Path(config.get('template_cache_dir', './cache/templates'))
+            self.jinja_env = _template_environment(str(template_dir.resolve()), str(cache_dir.resolve()))
         else:
             self.jinja_env = None
+        
+        # Resolve the newsletter template once instead of listing the directory per render
+        self._newsletter_template = None
+        if self.jinja_env:
+            try:
+                self._newsletter_template = self.jinja_env.get_template('newsletter_template.md')
+            except TemplateNotFound:
+                pass
+        
+        self._article_template = _article_template()
             
     def sanitize_filename(self, filename: str) -> str:
         """Sanitize filename for filesystem compatibility."""
-        # Remove/replace invalid characters
-        filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-        filename = filename.strip()
-        # Limit length
-        if len(filename) > 200:
-            filename = filename[:200]
-        return filename
+        # Remove invalid characters and limit length
+        return filename.translate(_FILENAME_TRANS).strip()[:200]
     
     def format_article_section(self, article: Dict[str, Any], summary: Dict[str, Any]) -> str:
         """Format a single article section in markdown."""
-        section = f"### {article['title']}\n\n"
-        section += f"**Source:** [{article['source_name']}]({article['source_url']})\n"
-        
-        if article.get('author'):
-            section += f"**Author:** {article['author']}\n"
-        
-        if article.get('date'):
-            section += f"**Date:** {article['date']}\n"
-        
-        section += "\n"
-        section += f"**Summary:** {summary['short_summary']}\n\n"
-        
-        if summary.get('key_insights'):
-            section += "**Key Insights:**\n"
-            for insight in summary['key_insights']:
-                section += f"- {insight}\n"
-            section += "\n"
-        
-        if summary.get('tags'):
-            section += f"**Tags:** {', '.join(summary['tags'])}\n"
-        
-        section += "\n---\n\n"
-        return section
+        return self._article_template.render(article=article, summary=summary)
     
     def format_newsletter(self, newsletter_content: Dict[str, Any], 
                          all_articles: List[Dict[str, Any]],
-                         metadata: Optional[Dict[str, Any]] = None) -> str:
+                         metadata: Optional[Dict[str, Any]] = None,
+                         now: Optional[datetime] = None) -> str:
         """Format complete newsletter in markdown."""
+        now = now or datetime.now()
+        
         # Use template if available
-        if self.jinja_env and 'newsletter_template.md' in self.jinja_env.list_templates():
-            template = self.jinja_env.get_template('newsletter_template.md')
-            return template.render(
+        if self._newsletter_template is not None:
+            return self._newsletter_template.render(
                 newsletter=newsletter_content,
                 articles=all_articles,
                 metadata=metadata or {},
-                date=datetime.now()
+                date=now
             )
         
         # Fallback to manual formatting
-        content = f"# {newsletter_content['title']}\n\n"
-        content += f"*Generated on {datetime.now().strftime('%B %d, %Y')}*\n\n"
+        parts = [f"# {newsletter_content['title']}\n\n"]
+        parts.append(f"*Generated on {now.strftime('%B %d, %Y')}*\n\n")
         
         # Table of Contents
-        content += "## Table of Contents\n\n"
-        content += "1. [Introduction](#introduction)\n"
-        content += "2. [Top Stories](#top-stories)\n"
-        content += "3. [Trends](#trends)\n"
-        content += "4. [Insights & Analysis](#insights--analysis)\n"
-        content += "5. [All Articles](#all-articles)\n\n"
+        parts.append("## Table of Contents\n\n")
+        parts.append("1. [Introduction](#introduction)\n")
+        parts.append("2. [Top Stories](#top-stories)\n")
+        parts.append("3. [Trends](#trends)\n")
+        parts.append("4. [Insights & Analysis](#insights--analysis)\n")
+        parts.append("5. [All Articles](#all-articles)\n\n")
         
         # Introduction
-        content += "## Introduction\n\n"
-        content += f"{newsletter_content['introduction']}\n\n"
+        parts.append("## Introduction\n\n")
+        parts.append(f"{newsletter_content['introduction']}\n\n")
         
         # Top Stories
-        content += "## Top Stories\n\n"
+        parts.append("## Top Stories\n\n")
         for i, story in enumerate(newsletter_content['top_stories'], 1):
-            content += f"### {i}. {story['title']}\n\n"
-            content += f"**Source:** [{story['source']}]({story['url']})\n\n"
-            content += f"{story['summary']}\n\n"
+            parts.append(f"### {i}. {story['title']}\n\n")
+            parts.append(f"**Source:** [{story['source']}]({story['url']})\n\n")
+            parts.append(f"{story['summary']}\n\n")
             
             if story.get('key_insights'):
-                content += "**Key Points:**\n"
+                parts.append("**Key Points:**\n")
                 for insight in story['key_insights']:
-                    content += f"- {insight}\n"
-                content += "\n"
+                    parts.append(f"- {insight}\n")
+                parts.append("\n")
         
         # Trends
         if newsletter_content.get('trends'):
-            content += "## Trends\n\n"
+            parts.append("## Trends\n\n")
             for trend in newsletter_content['trends']:
-                content += f"- {trend}\n"
-            content += "\n"
+                parts.append(f"- {trend}\n")
+            parts.append("\n")
         
         # Insights
-        content += "## Insights & Analysis\n\n"
-        content += f"{newsletter_content['insights']}\n\n"
+        parts.append("## Insights & Analysis\n\n")
+        parts.append(f"{newsletter_content['insights']}\n\n")
         
         # All Articles
         if all_articles:
-            content += "## All Articles\n\n"
+            parts.append("## All Articles\n\n")
             for article_data in all_articles:
                 article = article_data['article']
                 summary = article_data['summary']
-                content += self.format_article_section(article, summary)
+                parts.append(self.format_article_section(article, summary))
         
         # Footer
-        content += "---\n\n"
-        content += "*This newsletter was generated automatically by AI News Summarizer.*\n"
+        parts.append("---\n\n")
+        parts.append("*This newsletter was generated automatically by AI News Summarizer.*\n")
         
-        return content
+        return ''.join(parts)
     
     def publish_newsletter(self, newsletter_content: Dict[str, Any],
                           all_articles: List[Dict[str, Any]],
@@ -134,17 +183,18 @@ class MarkdownPublisher:
         """Publish newsletter to markdown file."""
         try:
             # Generate filename
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            now = datetime.now()
+            date_str = now.strftime('%Y-%m-%d')
             niche = metadata.get('niche', 'news') if metadata else 'news'
             base_filename = f"{date_str}-{niche}-digest"
             filename = self.sanitize_filename(base_filename) + ".md"
             
             # Format content
-            content = self.format_newsletter(newsletter_content, all_articles, metadata)
+            content = self.format_newsletter(newsletter_content, all_articles, metadata, now)
             
             # Write to file
             filepath = self.output_dir / filename
-            filepath.write_text(content, encoding='utf-8')
+            _write_markdown(filepath, content, self.fsync)
             
             logger.info(f"Newsletter published to {filepath}")
             
@@ -165,13 +215,14 @@ class MarkdownPublisher:
         """Publish a single article as markdown."""
         try:
             # Generate filename
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            now = datetime.now()
+            date_str = now.strftime('%Y-%m-%d')
             title_slug = self.sanitize_filename(article['title'][:50])
             filename = f"{date_str}-{title_slug}.md"
             
             # Format content
             content = f"# {article['title']}\n\n"
-            content += f"*Published on {datetime.now().strftime('%B %d, %Y')}*\n\n"
+            content += f"*Published on {now.strftime('%B %d, %Y')}*\n\n"
             content += self.format_article_section(article, summary)
             
             # Add detailed summary if available
@@ -184,9 +235,9 @@ class MarkdownPublisher:
             articles_dir.mkdir(exist_ok=True)
             
             filepath = articles_dir / filename
-            filepath.write_text(content, encoding='utf-8')
+            _write_markdown(filepath, content, self.fsync)
             
-            logger.info(f"Article published to {filepath}")
+            logger.debug(f"Article published to {filepath}")
             return str(filepath)
             
         except Exception as e:
@@ -196,39 +247,43 @@ class MarkdownPublisher:
     def generate_index(self, published_files: List[str]) -> str:
         """Generate an index file linking to all published content."""
         try:
-            content = "# AI News Summarizer - Index\n\n"
-            content += f"*Last updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}*\n\n"
+            parts = ["# AI News Summarizer - Index\n\n"]
+            parts.append(f"*Last updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}*\n\n")
             
-            # Group files by type
+            # Group files by type; plain string work, no Path per entry
+            base = str(self.output_dir) + os.sep
+            articles_part = f"{os.sep}articles{os.sep}"
             newsletters = []
             articles = []
             
             for filepath in published_files:
-                path = Path(filepath)
-                if 'articles' in path.parts:
-                    articles.append(path)
+                if articles_part in os.sep + filepath:
+                    articles.append(filepath)
                 else:
-                    newsletters.append(path)
+                    newsletters.append(filepath)
+            
+            def index_entry(filepath: str) -> str:
+                relative_path = filepath[len(base):] if filepath.startswith(base) else filepath
+                stem = os.path.splitext(os.path.basename(filepath))[0]
+                return f"- [{stem}]({relative_path})\n"
             
             # List newsletters
             if newsletters:
-                content += "## Newsletters\n\n"
-                for path in sorted(newsletters, reverse=True):
-                    relative_path = path.relative_to(self.output_dir)
-                    content += f"- [{path.stem}]({relative_path})\n"
-                content += "\n"
+                parts.append("## Newsletters\n\n")
+                for filepath in sorted(newsletters, key=os.path.basename, reverse=True):
+                    parts.append(index_entry(filepath))
+                parts.append("\n")
             
             # List articles
             if articles:
-                content += "## Individual Articles\n\n"
-                for path in sorted(articles, reverse=True)[:20]:  # Last 20 articles
-                    relative_path = path.relative_to(self.output_dir)
-                    content += f"- [{path.stem}]({relative_path})\n"
-                content += "\n"
+                parts.append("## Individual Articles\n\n")
+                for filepath in sorted(articles, key=os.path.basename, reverse=True)[:20]:  # Last 20 articles
+                    parts.append(index_entry(filepath))
+                parts.append("\n")
             
             # Write index
             index_path = self.output_dir / "index.md"
-            index_path.write_text(content, encoding='utf-8')
+            _write_markdown(index_path, ''.join(parts), self.fsync)
             
             logger.info(f"Index generated at {index_path}")
             return str(index_path)
@@ -287,4 +342,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
\ No newline at end of file
@@ -1,16 +1,92 @@
 import os
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional
+import time
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from typing import Dict, List, Any, Optional, Mapping
 from datetime import datetime
-import json
+from pathlib import Path
 
-import tweepy
+import httpx
+import orjson
+from oauthlib.oauth1 import Client as OAuth1Client
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TWEETS_URL = 'https://api.twitter.com/2/tweets'
+
+# twitter-text v3 weighting: these BMP ranges count 1, every other code point counts 2
+_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+_WEIGHT = array('B', [2]) * 0x10000
+for _start, _end in _LIGHT_RANGES:
+    _WEIGHT[_start:_end + 1] = array('B', [1]) * (_end - _start + 1)
+
+
+def _char_weights(text: str) -> List[int]:
+    """Twitter weight of each character in text."""
+    return [_WEIGHT[o] if (o := ord(c)) < 0x10000 else 2 for c in text]
+
+
+def _weighted_len(text: str) -> int:
+    """Length of text as Twitter counts it towards the tweet limit."""
+    return sum(_char_weights(text))
+
+
+class OAuth1Auth(httpx.Auth):
+    """Signs requests with OAuth 1.0a user context (JSON bodies are not signed)."""
+    
+    def __init__(self, consumer_key: str, consumer_secret: str,
+                 access_token: str, access_token_secret: str):
+        self._client = OAuth1Client(
+            consumer_key,
+            client_secret=consumer_secret,
+            resource_owner_key=access_token,
+            resource_owner_secret=access_token_secret
+        )
+    
+    def auth_flow(self, request: httpx.Request):
+        _, headers, _ = self._client.sign(str(request.url), request.method)
+        request.headers['Authorization'] = headers['Authorization']
+        yield request
+
+
+class RateLimitSemaphore:
+    """Admits calls to one endpoint while its rate-limit window has allowance left."""
+    
+    def __init__(self, initial: int = 50, reset_at: float = 0.0):
+        self._lock = asyncio.Lock()
+        self.remaining = initial
+        self.reset_at = reset_at
+    
+    async def __aenter__(self):
+        # The lock only guards the allowance check; requests themselves run concurrently
+        async with self._lock:
+            if self.remaining <= 0:
+                delay = self.reset_at - time.time()
+                if delay > 0:
+                    logger.warning("Twitter rate limit reached, waiting %.0fs", delay)
+                    await asyncio.sleep(delay)
+                # New window; the next response reports the real allowance
+                self.remaining = 1
+            self.remaining -= 1
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+    
+    def update(self, headers: Mapping[str, str]):
+        """Record the allowance reported by x-rate-limit-* response headers."""
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset is not None:
+            self.reset_at = float(reset)
+
 
 class TwitterPublisher:
     def __init__(self, config: Dict[str, Any]):
@@ -21,18 +97,57 @@ class TwitterPublisher:
             # Load API keys from environment
             api_keys = self._load_api_keys()
             
-            # Initialize Twitter client
-            self.client = tweepy.Client(
-                consumer_key=api_keys['consumer_key'],
-                consumer_secret=api_keys['consumer_secret'],
-                access_token=api_keys['access_token'],
-                access_token_secret=api_keys['access_token_secret']
+            # One keep-alive HTTP/2 connection shared by every tweet in a thread
+            self.client = httpx.AsyncClient(
+                http2=True,
+                timeout=30,
+                auth=OAuth1Auth(
+                    api_keys['consumer_key'],
+                    api_keys['consumer_secret'],
+                    api_keys['access_token'],
+                    api_keys['access_token_secret']
+                )
             )
             
+            # Per-endpoint rate-limit state, fed from response headers and kept across runs
+            self.rate_limit_path = Path(config.get('rate_limit_path', './cache/twitter_rate_limits.json'))
+            self._limits = defaultdict(RateLimitSemaphore)
+            self._load_rate_limits()
+            
             # Character limits
             self.max_tweet_length = 280
             self.thread_delimiter = config.get('thread_delimiter', '🧵')
     
+    async def aclose(self):
+        """Save rate-limit state and close the HTTP client."""
+        if self.enabled:
+            await asyncio.to_thread(self._save_rate_limits)
+            await self.client.aclose()
+    
+    def _load_rate_limits(self):
+        """Seed endpoint allowances from the last run while their windows are still open."""
+        try:
+            if not self.rate_limit_path.exists():
+                return
+            now = time.time()
+            for endpoint, state in orjson.loads(self.rate_limit_path.read_bytes()).items():
+                if state['reset_at'] > now:
+                    self._limits[endpoint] = RateLimitSemaphore(state['remaining'], state['reset_at'])
+        except Exception as e:
+            logger.warning("Failed to load Twitter rate limits: %s", e)
+    
+    def _save_rate_limits(self):
+        """Persist endpoint allowances for the next run."""
+        try:
+            self.rate_limit_path.parent.mkdir(parents=True, exist_ok=True)
+            state = {
+                endpoint: {'remaining': limit.remaining, 'reset_at': limit.reset_at}
+                for endpoint, limit in self._limits.items()
+            }
+            self.rate_limit_path.write_bytes(orjson.dumps(state))
+        except Exception as e:
+            logger.warning("Failed to save Twitter rate limits: %s", e)
+    
     def _load_api_keys(self) -> Dict[str, str]:
         """Load Twitter API keys from environment."""
         api_keys_env = self.config.get('api_keys_env', 'TWITTER_API_KEYS')
@@ -42,8 +157,8 @@ class TwitterPublisher:
             raise ValueError(f"Twitter API keys not found in {api_keys_env}")
         
         try:
-            return json.loads(api_keys_json)
-        except json.JSONDecodeError:
+            return orjson.loads(api_keys_json)
+        except orjson.JSONDecodeError:
             # Try individual env vars as fallback
             return {
                 'consumer_key': os.getenv('TWITTER_CONSUMER_KEY'),
@@ -53,11 +168,14 @@ class TwitterPublisher:
             }
     
     def _truncate_text(self, text: str, max_length: int, suffix: str = "...") -> str:
-        """Truncate text to fit within character limit."""
-        if len(text) <= max_length:
+        """Truncate text to fit within Twitter's weighted character limit."""
+        totals = list(accumulate(_char_weights(text)))
+        if not totals or totals[-1] <= max_length:
             return text
         
-        return text[:max_length - len(suffix)] + suffix
+        # Longest prefix whose weight still leaves room for the suffix
+        cutoff = bisect_right(totals, max_length - _weighted_len(suffix))
+        return text[:cutoff] + suffix
     
     def _create_thread_tweets(self, content: List[str], 
                             thread_number: Optional[int] = None) -> List[str]:
@@ -70,7 +188,7 @@ class TwitterPublisher:
         for i, text in enumerate(content):
             if i == 0:
                 # First tweet gets thread marker
-                max_length = self.max_tweet_length - len(first_tweet_suffix)
+                max_length = self.max_tweet_length - _weighted_len(first_tweet_suffix)
                 tweet = self._truncate_text(text, max_length) + first_tweet_suffix
             else:
                 # Subsequent tweets
@@ -85,19 +203,28 @@ class TwitterPublisher:
                          reply_to_tweet_id: Optional[str] = None) -> Optional[str]:
         """Post a single tweet."""
         try:
-            response = await asyncio.to_thread(
-                self.client.create_tweet,
-                text=text,
-                reply_to_tweet_id=reply_to_tweet_id
-            )
+            payload = {'text': text}
+            if reply_to_tweet_id:
+                payload['reply'] = {'in_reply_to_tweet_id': reply_to_tweet_id}
             
-            if response.data:
-                return response.data['id']
+            async with self._limits['create_tweet'] as limit:
+                response = await self.client.post(
+                    TWEETS_URL,
+                    content=orjson.dumps(payload),
+                    headers={'Content-Type': 'application/json'}
+                )
+                # Rate-limit headers come back on 429s too
+                limit.update(response.headers)
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content).get('data')
+            if data:
+                return data['id']
             
             return None
             
         except Exception as e:
-            logger.error(f"Error posting tweet: {e}")
+            logger.error("Error posting tweet: %s", e)
             raise
     
     async def publish_newsletter_thread(self, 
@@ -134,26 +261,29 @@ class TwitterPublisher:
                 closing_tweet = f"📖 Read the full newsletter with {len(top_articles)} articles and detailed analysis:\n{self.config['newsletter_url']}"
                 thread_content.append(closing_tweet)
             
-            # Create thread
-            tweet_ids = []
-            reply_to_id = None
+            # Create thread: post the root, then attach every other tweet to it at once
+            root_id = await self._post_tweet(thread_content[0])
+            if not root_id:
+                logger.error("Failed to post tweet in thread")
+                return []
             
-            for content in thread_content:
-                tweet_id = await self._post_tweet(content, reply_to_id)
-                if tweet_id:
-                    tweet_ids.append(tweet_id)
-                    reply_to_id = tweet_id
-                    # Rate limiting
-                    await asyncio.sleep(2)
+            replies = await asyncio.gather(
+                *(self._post_tweet(content, root_id) for content in thread_content[1:]),
+                return_exceptions=True
+            )
+            
+            tweet_ids = [root_id]
+            for reply_id in replies:
+                if isinstance(reply_id, str):
+                    tweet_ids.append(reply_id)
                 else:
-                    logger.error("Failed to post tweet in thread")
-                    break
+                    logger.error("Failed to post tweet in thread: %s", reply_id)
             
-            logger.info(f"Published Twitter thread with {len(tweet_ids)} tweets")
+            logger.info("Published Twitter thread with %d tweets", len(tweet_ids))
             return tweet_ids
             
         except Exception as e:
-            logger.error(f"Error publishing Twitter thread: {e}")
+            logger.error("Error publishing Twitter thread: %s", e)
             return []
     
     async def publish_article_summary(self, 
@@ -183,13 +313,13 @@ class TwitterPublisher:
             tweet_id = await self._post_tweet(tweet)
             
             if tweet_id:
-                logger.info(f"Published article tweet: {tweet_id}")
+                logger.info("Published article tweet: %s", tweet_id)
                 return tweet_id
             
             return None
             
         except Exception as e:
-            logger.error(f"Error publishing article tweet: {e}")
+            logger.error("Error publishing article tweet: %s", e)
             return None
     
     async def publish_insights_thread(self, insights: str, niche: str) -> List[str]:
@@ -224,13 +354,12 @@ class TwitterPublisher:
                 if tweet_id:
                     tweet_ids.append(tweet_id)
                     reply_to_id = tweet_id
-                    await asyncio.sleep(2)
             
-            logger.info(f"Published insights thread with {len(tweet_ids)} tweets")
+            logger.info("Published insights thread with %d tweets", len(tweet_ids))
             return tweet_ids
             
         except Exception as e:
-            logger.error(f"Error publishing insights thread: {e}")
+            logger.error("Error publishing insights thread: %s", e)
             return []
 
 
@@ -258,9 +387,13 @@ async def main():
     }
     
     # Publish as thread
-    tweet_ids = await publisher.publish_newsletter_thread(newsletter_content, [])
+    try:
+        tweet_ids = await publisher.publish_newsletter_thread(newsletter_content, [])
+    finally:
+        await publisher.aclose()
     print(f"Published tweets: {tweet_ids}")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
\ No newline at end of file
@@ -1,4 +1,5 @@
 from .web_scraper import WebScraper, Article
 from .rss_parser import RSSParser
+from .fast_rss import process_rssfeeds
 
-__all__ = ['WebScraper', 'RSSParser', 'Article']
\ No newline at end of file
+__all__ = ['WebScraper', 'RSSParser', 'Article', 'process_rssfeeds']
\ No newline at end of file
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+import httpx
+import msgpack
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_RSS1 = '{http://purl.org/rss/1.0/}'
+_DC = '{http://purl.org/dc/elements/1.1/}'
+
+# Item elements of RSS 2.0, Atom and RSS 1.0 (RDF) feeds
+_ITEM_TAGS = ('item', f'{_ATOM}entry', f'{_RSS1}item')
+
+# Connections open at once across all feeds
+MAX_CONNECTIONS = 100
+
+# Feeds fetched at once from any one host, so many feeds on one site don't stampede it
+MAX_PER_HOST = 20
+
+# Read size when streaming feed bodies into the parser
+FEED_CHUNK_SIZE = 32768
+
+
+def _child_text(item, *tags: str) -> Optional[str]:
+    """Text of the first of the given child elements that has any."""
+    for tag in tags:
+        text = item.findtext(tag)
+        if text and text.strip():
+            return text.strip()
+    return None
+
+
+def _atom_link(entry) -> Optional[str]:
+    """href of an Atom entry's alternate link."""
+    for link in entry.iterfind(f'{_ATOM}link'):
+        if link.get('rel', 'alternate') == 'alternate' and link.get('href'):
+            return link.get('href')
+    return None
+
+
+def rss_parser(item) -> Dict[str, Optional[str]]:
+    """Headline fields of an RSS 2.0 <item>."""
+    return {
+        'title': _child_text(item, 'title'),
+        'link': _child_text(item, 'link', 'guid'),
+        'date': _child_text(item, 'pubDate', f'{_DC}date')
+    }
+
+
+def atom_parser(entry) -> Dict[str, Optional[str]]:
+    """Headline fields of an Atom <entry>."""
+    return {
+        'title': _child_text(entry, f'{_ATOM}title'),
+        'link': _atom_link(entry),
+        'date': _child_text(entry, f'{_ATOM}updated', f'{_ATOM}published')
+    }
+
+
+def rdf_parser(item) -> Dict[str, Optional[str]]:
+    """Headline fields of an RSS 1.0 (RDF) <item>."""
+    return {
+        'title': _child_text(item, f'{_RSS1}title'),
+        'link': _child_text(item, f'{_RSS1}link'),
+        'date': _child_text(item, f'{_DC}date')
+    }
+
+
+_PARSERS = {
+    'item': rss_parser,
+    f'{_ATOM}entry': atom_parser,
+    f'{_RSS1}item': rdf_parser
+}
+
+
+def _headline_parser() -> etree.XMLPullParser:
+    """Incremental parser that reports each feed item as it closes."""
+    return etree.XMLPullParser(events=('end',), tag=_ITEM_TAGS, recover=True, resolve_entities=False)
+
+
+def _read_headlines(parser: etree.XMLPullParser, headlines: List[Dict[str, Optional[str]]],
+                    max_items: Optional[int]) -> bool:
+    """Collect the items completed so far; True once max_items are in."""
+    for _, item in parser.read_events():
+        headline = _PARSERS[item.tag](item)
+        # Items are done with once read; drop them so memory stays at one item, not the feed
+        item.clear()
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+        if headline['title'] and headline['link']:
+            headlines.append(headline)
+            if max_items is not None and len(headlines) >= max_items:
+                return True
+    return False
+
+
+def parse_headlines(body: bytes, max_items: Optional[int] = None) -> List[Dict[str, Optional[str]]]:
+    """Extract title, link and date of each feed item, skipping descriptions and content."""
+    parser = _headline_parser()
+    headlines = []
+    parser.feed(body)
+    if not _read_headlines(parser, headlines, max_items):
+        parser.close()
+        _read_headlines(parser, headlines, max_items)
+    return headlines
+
+
+def _load_cache(path: Path) -> Dict[str, Any]:
+    """Load the headline cache, or start empty."""
+    try:
+        if path.exists():
+            return msgpack.unpackb(path.read_bytes(), raw=False)
+    except Exception as e:
+        logger.warning("Failed to load cache %s: %s", path, e)
+    return {}
+
+
+def _save_cache(path: Path, cache: Dict[str, Any]):
+    """Write the headline cache atomically."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        tmp_file.write_bytes(msgpack.packb(cache, use_bin_type=True))
+        os.replace(tmp_file, path)
+    except Exception as e:
+        logger.warning("Failed to save cache %s: %s", path, e)
+
+
+def _covers(cached: Dict[str, Any], max_items: Optional[int]) -> bool:
+    """Whether a cached read holds at least as many headlines as this one asks for."""
+    return cached['max_items'] is None or (max_items is not None and max_items <= cached['max_items'])
+
+
+async def _fetch_headlines(client: httpx.AsyncClient, url: str, max_items: Optional[int],
+                           host_semaphore: asyncio.Semaphore,
+                           cache: Optional[Dict[str, Any]] = None) -> List[Dict[str, Optional[str]]]:
+    """Stream one feed through the parser, hanging up once max_items are read.
+    
+    With a cache, the feed is requested conditionally and a 304 is answered
+    from the headlines stored on the last full response.
+    """
+    cached = cache.get(url) if cache is not None else None
+    if cached and not _covers(cached, max_items):
+        cached = None
+    
+    conditional = {}
+    if cached:
+        if cached.get('etag'):
+            conditional['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            conditional['If-Modified-Since'] = cached['last_modified']
+    
+    parser = _headline_parser()
+    headlines = []
+    async with host_semaphore:
+        async with client.stream('GET', url, headers=conditional) as response:
+            if response.status_code == 304 and cached:
+                return cached['headlines'][:max_items]
+            response.raise_for_status()
+            done = False
+            async for chunk in response.aiter_bytes(FEED_CHUNK_SIZE):
+                parser.feed(chunk)
+                done = _read_headlines(parser, headlines, max_items)
+                if done:
+                    break
+            if not done:
+                parser.close()
+                _read_headlines(parser, headlines, max_items)
+    
+    for headline in headlines:
+        headline['feed_url'] = url
+    
+    etag = response.headers.get('etag')
+    last_modified = response.headers.get('last-modified')
+    if cache is not None and (etag or last_modified):
+        cache[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'max_items': max_items,
+            'headlines': headlines
+        }
+    return headlines
+
+
+async def process_rssfeeds(urls: List[str], client: Optional[httpx.AsyncClient] = None,
+                           max_items: Optional[int] = None,
+                           timeout: float = 30,
+                           cache_path: Optional[Union[str, Path]] = None,
+                           max_per_host: int = MAX_PER_HOST) -> List[Dict[str, Optional[str]]]:
+    """Fetch feeds concurrently and return the headlines of all of them.
+    
+    A lightweight alternative to RSSParser for callers that only need
+    titles, links and dates; use RSSParser when article content is needed.
+    With cache_path, ETag / Last-Modified validators and headlines are kept
+    there so unchanged feeds come back as an empty 304. At most max_per_host
+    feeds are fetched from one host at a time.
+    """
+    cache = None
+    if cache_path is not None:
+        cache_path = Path(cache_path)
+        cache = await asyncio.to_thread(_load_cache, cache_path)
+    
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(
+            headers={'User-Agent': 'Mozilla/5.0 (compatible; NewsBot/1.0)'},
+            http2=True,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS)
+        )
+    
+    host_semaphores = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+    try:
+        results = await asyncio.gather(
+            *(_fetch_headlines(client, url, max_items, host_semaphores[urlparse(url).netloc], cache)
+              for url in urls),
+            return_exceptions=True
+        )
+    finally:
+        if own_client:
+            await client.aclose()
+    
+    if cache is not None:
+        await asyncio.to_thread(_save_cache, cache_path, cache)
+    
+    headlines = []
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logger.error("Error fetching feed %s: %s", url, result)
+        else:
+            headlines.extend(result)
+    return headlines
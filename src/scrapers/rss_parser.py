@@ -1,56 +1,173 @@
 import asyncio
+import functools
+import io
 import logging
+import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from urllib.parse import urlparse
-import xml.etree.ElementTree as ET
 
 import httpx
+import blake3
+import ciso8601
+import msgpack
 import feedparser
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 from dateutil import parser as date_parser
 
 from .web_scraper import Article, WebScraper
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pages larger than this are parsed off the event loop
+LARGE_PAGE_CHARS = 200_000
+
+# Read size when streaming feed bodies
+FEED_CHUNK_SIZE = 65536
+
+# Bytes read when sniffing whether a response looks like a feed
+FEED_SNIFF_BYTES = 1024
+
+# Cleaned entry contents remembered across runs, oldest dropped first
+CONTENT_CACHE_SIZE = 5000
+
+
+# Common article containers, most specific first
+ARTICLE_CONTAINER_SELECTOR = 'article, main, .article-content, .post-content, .entry-content, #content'
+_CONTAINER_CLASSES = ('article-content', 'post-content', 'entry-content')
+
+# Elements whose text is never article content
+_NON_CONTENT_TAGS = ['script', 'style', 'noscript']
+
+
+def _container_rank(node) -> int:
+    """Position of the first ARTICLE_CONTAINER_SELECTOR alternative the node matches."""
+    if node.tag == 'article':
+        return 0
+    if node.tag == 'main':
+        return 1
+    classes = (node.attributes.get('class') or '').split()
+    for rank, name in enumerate(_CONTAINER_CLASSES, 2):
+        if name in classes:
+            return rank
+    return 5  # #content
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_string(date_str: str) -> datetime:
+    """Parse a feed date string, trying the fast ISO 8601 path first."""
+    try:
+        return ciso8601.parse_datetime(date_str)
+    except ValueError:
+        # RFC 822 and other free-form dates; feeds repeat the same few shapes
+        return date_parser.parse(date_str)
+
 
 class RSSParser:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self.timeout = config.get('timeout', 30)
         self.headers = {
             'User-Agent': config.get('user_agent', 
                 'Mozilla/5.0 (compatible; NewsBot/1.0)')
         }
-        self.web_scraper = WebScraper(config)
+        self.semaphore = asyncio.Semaphore(config.get('max_concurrent_requests', 20))
+        self.web_scraper = WebScraper(config, client)
+        # Without a shared client, reuse the scraper's pooled one for feeds too
+        self.client = self.web_scraper.session
+        
+        # Validators and parsed articles per feed URL, for conditional GETs
+        self.feed_cache_path = Path(config.get('feed_cache_path', './cache/feed_cache.msgpack'))
+        self._feed_cache = self._load_msgpack(self.feed_cache_path)
+        self._feed_cache_dirty = False
+        
+        # Cleaned (and possibly fully fetched) content per entry, keyed on entry id + raw content
+        self.content_cache_path = Path(config.get('content_cache_path', './cache/feed_content.msgpack'))
+        self._content_cache = self._load_msgpack(self.content_cache_path)
+        self._content_cache_dirty = False
+    
+    async def aclose(self):
+        """Save the feed caches and close the HTTP client if this parser created it."""
+        await asyncio.to_thread(self.save_feed_cache)
+        await self.web_scraper.aclose()
+    
+    def _load_msgpack(self, path: Path) -> Dict[Any, Any]:
+        """Load a msgpack cache file, or start empty."""
+        try:
+            if path.exists():
+                return msgpack.unpackb(path.read_bytes(), raw=False)
+        except Exception as e:
+            logger.warning("Failed to load cache %s: %s", path, e)
+        return {}
+    
+    def _save_msgpack(self, path: Path, data: Dict[Any, Any]):
+        """Write a msgpack cache file atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix('.tmp')
+        tmp_file.write_bytes(msgpack.packb(data, use_bin_type=True))
+        os.replace(tmp_file, path)
+    
+    def save_feed_cache(self):
+        """Save the feed and content caches to disk if either changed."""
+        try:
+            if self._feed_cache_dirty:
+                self._save_msgpack(self.feed_cache_path, self._feed_cache)
+                self._feed_cache_dirty = False
+            if self._content_cache_dirty:
+                self._save_msgpack(self.content_cache_path, self._content_cache)
+                self._content_cache_dirty = False
+        except Exception as e:
+            logger.warning("Failed to save feed cache: %s", e)
+    
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET a URL through the pooled client."""
+        async with self.semaphore:
+            return await self.client.get(url, headers={**self.headers, **(headers or {})})
+    
+    async def _stream(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[httpx.Response, io.BytesIO]:
+        """GET a URL, streaming a successful body into a buffer for the parser."""
+        body = io.BytesIO()
+        async with self.semaphore:
+            async with self.client.stream('GET', url, headers={**self.headers, **(headers or {})}) as response:
+                if response.is_success:
+                    async for chunk in response.aiter_bytes(FEED_CHUNK_SIZE):
+                        body.write(chunk)
+        body.seek(0)
+        return response, body
         
     async def validate_feed(self, feed_url: str) -> bool:
         """Validate if the URL is a valid RSS/Atom feed."""
         try:
-            async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout) as client:
-                response = await client.get(feed_url)
-                response.raise_for_status()
-                
-                # Check content type
-                content_type = response.headers.get('content-type', '').lower()
-                if any(ct in content_type for ct in ['xml', 'rss', 'atom']):
-                    return True
-                
-                # Try to parse as XML
-                try:
-                    ET.fromstring(response.text)
-                    return True
-                except ET.ParseError:
-                    return False
+            async with self.semaphore:
+                async with self.client.stream('GET', feed_url, headers=self.headers) as response:
+                    response.raise_for_status()
+                    
+                    # Check content type
+                    content_type = response.headers.get('content-type', '').lower()
+                    if any(ct in content_type for ct in ['xml', 'rss', 'atom']):
+                        return True
                     
+                    # Otherwise sniff the first KB for a feed signature
+                    head = b''
+                    async for chunk in response.aiter_bytes(FEED_SNIFF_BYTES):
+                        head += chunk
+                        if len(head) >= FEED_SNIFF_BYTES:
+                            break
+            
+            head = head[:FEED_SNIFF_BYTES]
+            return head.lstrip().startswith(b'<?xml') or b'<rss' in head or b'<feed' in head
+                
         except Exception as e:
-            logger.error(f"Feed validation failed for {feed_url}: {e}")
+            logger.error("Feed validation failed for %s: %s", feed_url, e)
             return False
     
     def extract_full_content(self, entry: Dict[str, Any]) -> str:
         """Extract full content from feed entry."""
+        return self._strip_html(self._raw_entry_content(entry))
+    
+    def _raw_entry_content(self, entry: Dict[str, Any]) -> str:
+        """The first non-empty content field of a feed entry, as published."""
         content = ""
         
         # Try different content fields
@@ -73,13 +190,29 @@ class RSSParser:
                 if content:
                     break
         
-        # Clean HTML if present
+        return content
+    
+    def _strip_html(self, content: str) -> str:
+        """Reduce HTML content to its text."""
         if '<' in content and '>' in content:
-            soup = BeautifulSoup(content, 'html.parser')
-            content = soup.get_text(separator=' ', strip=True)
-        
+            content = LexborHTMLParser(content).text(separator=' ', strip=True)
         return content
     
+    def _content_key(self, entry: Dict[str, Any], raw_content: str, fetch_full: bool) -> bytes:
+        """Cache key for an entry's content; changes whenever the entry's content does."""
+        hasher = blake3.blake3()
+        hasher.update((entry.get('id') or entry.get('link') or '').encode())
+        hasher.update(b'\x01' if fetch_full else b'\x00')
+        hasher.update(raw_content.encode())
+        return hasher.digest(length=16)
+    
+    def _remember_content(self, key: bytes, content: str):
+        """Cache an entry's final content, dropping the oldest entries past the limit."""
+        self._content_cache[key] = content
+        while len(self._content_cache) > CONTENT_CACHE_SIZE:
+            del self._content_cache[next(iter(self._content_cache))]
+        self._content_cache_dirty = True
+    
     def parse_date(self, entry: Dict[str, Any]) -> Optional[datetime]:
         """Parse date from various feed date fields."""
         date_fields = ['published_parsed', 'updated_parsed', 'created_parsed']
@@ -97,7 +230,7 @@ class RSSParser:
         for field in date_str_fields:
             if field in entry and entry[field]:
                 try:
-                    return date_parser.parse(entry[field])
+                    return _parse_date_string(entry[field])
                 except Exception:
                     pass
         
@@ -121,40 +254,39 @@ class RSSParser:
         
         return None
     
+    def _extract_article_text(self, html: str) -> Optional[str]:
+        """Extract the main article text from a full HTML page."""
+        tree = LexborHTMLParser(html)
+        
+        # Remove script, style and noscript elements in one pass before any text is read
+        tree.strip_tags(_NON_CONTENT_TAGS)
+        
+        # Try common article containers in one tree walk, preferring them in listed order
+        matches = tree.css(ARTICLE_CONTAINER_SELECTOR)
+        if matches:
+            content_elem = min(matches, key=_container_rank)
+            return content_elem.text(separator=' ', strip=True)
+        
+        # Fallback to body
+        body = tree.body
+        if body:
+            return body.text(separator=' ', strip=True)[:5000]  # Limit length
+        
+        return None
+    
     async def fetch_full_article(self, url: str, feed_name: str) -> Optional[str]:
         """Attempt to fetch full article content from the URL."""
         try:
-            async with self.web_scraper as scraper:
-                # Simple content extraction - can be enhanced with specific selectors
-                html = await scraper.fetch_page(url)
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Try common article containers
-                article_selectors = [
-                    'article',
-                    'main',
-                    '.article-content',
-                    '.post-content',
-                    '.entry-content',
-                    '#content'
-                ]
-                
-                for selector in article_selectors:
-                    content_elem = soup.select_one(selector)
-                    if content_elem:
-                        return content_elem.get_text(separator=' ', strip=True)
+            # Simple content extraction - can be enhanced with specific selectors
+            html = await self.web_scraper.fetch_page(url)
+            
+            # Large pages are parsed in a worker thread so other feeds keep moving
+            if len(html) > LARGE_PAGE_CHARS:
+                return await asyncio.to_thread(self._extract_article_text, html)
+            return self._extract_article_text(html)
                 
-                # Fallback to body
-                body = soup.find('body')
-                if body:
-                    return body.get_text(separator=' ', strip=True)[:5000]  # Limit length
-                    
         except Exception as e:
-            logger.warning(f"Failed to fetch full article from {url}: {e}")
+            logger.warning("Failed to fetch full article from %s: %s", url, e)
         
         return None
     
@@ -168,15 +300,27 @@ class RSSParser:
             if not title or not link:
                 return None
             
-            # Extract content
-            content = self.extract_full_content(entry)
-            
-            # Try to fetch full article if configured
-            if feed_config.get('fetch_full_content', False) and link:
-                full_content = await self.fetch_full_article(link, feed_config['name'])
-                if full_content and len(full_content) > len(content):
-                    content = full_content
-            
+            # Reuse the content worked out on an earlier run unless the entry changed
+            raw_content = self._raw_entry_content(entry)
+            fetch_full = feed_config.get('fetch_full_content', False)
+            content_key = self._content_key(entry, raw_content, fetch_full)
+            content = self._content_cache.get(content_key)
+
+            if content is None:
+                content = self._strip_html(raw_content)
+                fetched = True
+
+                # Try to fetch full article if configured
+                if fetch_full and link:
+                    full_content = await self.fetch_full_article(link, feed_config['name'])
+                    fetched = full_content is not None
+                    if full_content and len(full_content) > len(content):
+                        content = full_content
+
+                # A failed fetch leaves just the teaser; retry it next run rather than caching it
+                if fetched:
+                    self._remember_content(content_key, content)
+
             if not content:
                 return None
             
@@ -194,55 +338,83 @@ class RSSParser:
             )
             
         except Exception as e:
-            logger.error(f"Error parsing feed entry: {e}")
+            logger.error("Error parsing feed entry: %s", e)
             return None
     
-    async def parse_feed(self, feed_config: Dict[str, Any]) -> List[Article]:
-        """Parse all entries from a single RSS/Atom feed."""
+    async def parse_feed(self, feed_config: Dict[str, Any],
+                         is_new: Optional[Callable[[Article], bool]] = None) -> List[Article]:
+        """Parse all entries from a single RSS/Atom feed, dropping any rejected by is_new."""
         feed_url = feed_config['url']
-        
-        # Validate feed
-        if not await self.validate_feed(feed_url):
-            logger.error(f"Invalid feed: {feed_url}")
-            return []
+        cached = self._feed_cache.get(feed_url)
         
         try:
-            # Fetch and parse feed
-            async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout) as client:
-                response = await client.get(feed_url)
-                response.raise_for_status()
-                feed_data = feedparser.parse(response.text)
+            # Fetch and parse feed, letting the server answer 304 if nothing changed
+            conditional = {}
+            if cached:
+                if cached.get('etag'):
+                    conditional['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    conditional['If-Modified-Since'] = cached['last_modified']
+            
+            response, body = await self._stream(feed_url, conditional)
+            
+            if response.status_code == 304 and cached:
+                articles = [Article.from_dict(data) for data in cached['articles']]
+                articles = [article for article in articles if is_new is None or is_new(article)]
+                logger.info("Feed unchanged, %d cached articles from %s", len(articles), feed_config.get('name', feed_url))
+                return articles
+            
+            response.raise_for_status()
+            # feedparser is pure Python; keep it off the event loop
+            feed_data = await asyncio.to_thread(feedparser.parse, body)
+            
+            # Validate from the same response rather than downloading the feed twice
+            if feed_data.bozo and not feed_data.entries:
+                logger.error("Invalid feed: %s", feed_url)
+                return []
             
             if feed_data.bozo:
-                logger.warning(f"Feed parsing issues for {feed_url}: {feed_data.bozo_exception}")
+                logger.warning("Feed parsing issues for %s: %s", feed_url, feed_data.bozo_exception)
             
-            # Parse entries
-            articles = []
+            # Parse entries concurrently; full-article fetches are bounded per host by the scraper
             max_articles = feed_config.get('max_articles', 20)
+            results = await asyncio.gather(
+                *(self.parse_feed_entry(entry, feed_config) for entry in feed_data.entries[:max_articles]),
+                return_exceptions=True
+            )
+            parsed = [article for article in results if isinstance(article, Article)]
             
-            for entry in feed_data.entries[:max_articles]:
-                article = await self.parse_feed_entry(entry, feed_config)
-                if article:
-                    articles.append(article)
+            # Remember the full parse so a later 304 can be answered from disk
+            etag = response.headers.get('etag')
+            last_modified = response.headers.get('last-modified')
+            if etag or last_modified:
+                self._feed_cache[feed_url] = {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'articles': [article.to_dict() for article in parsed]
+                }
+                self._feed_cache_dirty = True
             
-            logger.info(f"Parsed {len(articles)} articles from {feed_config.get('name', feed_url)}")
+            articles = [article for article in parsed if is_new is None or is_new(article)]
+            logger.info("Parsed %d articles from %s", len(articles), feed_config.get('name', feed_url))
             return articles
             
         except Exception as e:
-            logger.error(f"Error parsing feed {feed_url}: {e}")
+            logger.error("Error parsing feed %s: %s", feed_url, e)
             return []
     
-    async def parse_all_feeds(self, feeds: List[Dict[str, Any]]) -> List[Article]:
+    async def parse_all_feeds(self, feeds: List[Dict[str, Any]],
+                              is_new: Optional[Callable[[Article], bool]] = None) -> List[Article]:
         """Parse all configured RSS/Atom feeds."""
         all_articles = []
         
         # Process feeds concurrently
-        tasks = [self.parse_feed(feed_config) for feed_config in feeds]
+        tasks = [self.parse_feed(feed_config, is_new) for feed_config in feeds]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         for i, result in enumerate(results):
             if isinstance(result, Exception):
-                logger.error(f"Feed parsing failed: {result}")
+                logger.error("Feed parsing failed: %s", result)
             elif isinstance(result, list):
                 all_articles.extend(result)
         
@@ -265,7 +437,10 @@ async def main():
     ]
     
     parser = RSSParser(config)
-    articles = await parser.parse_all_feeds(feeds)
+    try:
+        articles = await parser.parse_all_feeds(feeds)
+    finally:
+        await parser.aclose()
     
     for article in articles:
         print(f"Title: {article.title}")
@@ -277,4 +452,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
\ No newline at end of file
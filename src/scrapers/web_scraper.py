@@ -1,21 +1,31 @@
 import asyncio
 import logging
+from collections import defaultdict
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Callable
+from dataclasses import dataclass, field
 from urllib.parse import urljoin, urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+import blake3
+import ciso8601
+from aiolimiter import AsyncLimiter
+from selectolax.lexbor import LexborHTMLParser
 from tenacity import retry, stop_after_attempt, wait_exponential
 import lxml.html
-from lxml import etree
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _join_url(base_url: str, href: str) -> str:
+    """Resolve href against base_url, skipping urljoin for absolute links."""
+    if href.startswith(('http://', 'https://')):
+        return href
+    return urljoin(base_url, href)
+
+
+@dataclass(slots=True)
 class Article:
     title: str
     content: str
@@ -23,20 +33,47 @@ class Article:
     date: Optional[datetime]
     source_url: str
     source_name: str
+    _content_hash: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    _FIELDS = ('title', 'content', 'author', 'date', 'source_url', 'source_name')
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            'title': self.title,
-            'content': self.content,
-            'author': self.author,
-            'date': self.date.isoformat() if self.date else None,
-            'source_url': self.source_url,
-            'source_name': self.source_name
-        }
+        data = {name: getattr(self, name) for name in self._FIELDS}
+        if self.date:
+            data['date'] = self.date.isoformat()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Article':
+        """Rebuild an article from the output of to_dict."""
+        date = data.get('date')
+        return cls(
+            **{name: data.get(name) for name in cls._FIELDS if name != 'date'},
+            date=datetime.fromisoformat(date) if date else None
+        )
+    
+    @classmethod
+    def to_columns(cls, articles: List['Article']) -> Dict[str, List[Any]]:
+        """Convert a batch of articles into one list per field."""
+        columns = {name: [getattr(article, name) for article in articles] for name in cls._FIELDS}
+        columns['date'] = [date.isoformat() if date else None for date in columns['date']]
+        return columns
+    
+    @property
+    def content_hash(self) -> bytes:
+        """Deduplication key (raw 16-byte digest), computed once per article."""
+        if self._content_hash is None:
+            hasher = blake3.blake3()
+            # Separate the parts so different field splits of the same text hash differently
+            for part in (self.title, self.source_url, self.content[:200]):
+                hasher.update(part.encode())
+                hasher.update(b'\x00')
+            self._content_hash = hasher.digest(length=16)
+        return self._content_hash
 
 
 class WebScraper:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self.rate_limit_delay = config.get('rate_limit_delay', 1.0)
         self.timeout = config.get('timeout', 30)
@@ -44,61 +81,81 @@ class WebScraper:
             'User-Agent': config.get('user_agent', 
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
         }
-        self.session = None
-        
-    async def __aenter__(self):
-        self.session = httpx.AsyncClient(
+        # A shared client is owned by the caller and never closed here
+        self._owns_session = client is None
+        self.session = client or httpx.AsyncClient(
             headers=self.headers,
             timeout=self.timeout,
-            follow_redirects=True
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
         )
+        self.semaphore = asyncio.Semaphore(config.get('max_concurrent_requests', 20))
+        
+        # Per-host politeness: at most one article request per rate_limit_delay,
+        # with a few requests allowed in flight at once
+        max_per_host = config.get('max_concurrent_per_host', 5)
+        self._host_semaphores = defaultdict(lambda: asyncio.Semaphore(max_per_host))
+        self._host_limiters = defaultdict(lambda: AsyncLimiter(1, self.rate_limit_delay))
+        
+    async def __aenter__(self):
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the HTTP client if this scraper created it."""
+        if self._owns_session:
             await self.session.aclose()
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def fetch_page(self, url: str) -> str:
         """Fetch page content with retry logic."""
         try:
-            response = await self.session.get(url)
+            async with self.semaphore, self._host_semaphores[urlparse(url).netloc]:
+                response = await self.session.get(url, headers=self.headers)
             response.raise_for_status()
             return response.text
         except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
+            logger.error("Error fetching %s: %s", url, e)
             raise
     
-    def extract_with_css(self, soup: BeautifulSoup, selector: str, 
+    def extract_with_css(self, tree: LexborHTMLParser, selector: str, 
                         attribute: Optional[str] = None) -> Optional[str]:
         """Extract text or attribute using CSS selector."""
         try:
-            element = soup.select_one(selector)
+            element = tree.css_first(selector)
             if element:
                 if attribute:
-                    return element.get(attribute)
-                return element.get_text(strip=True)
+                    return element.attributes.get(attribute)
+                return element.text(strip=True)
         except Exception as e:
-            logger.warning(f"CSS extraction failed for {selector}: {e}")
+            logger.warning("CSS extraction failed for %s: %s", selector, e)
         return None
     
-    def extract_with_xpath(self, html: str, xpath: str) -> Optional[str]:
+    def extract_with_xpath(self, tree: lxml.html.HtmlElement, xpath: str) -> Optional[str]:
         """Extract text using XPath."""
         try:
-            tree = lxml.html.fromstring(html)
             result = tree.xpath(xpath)
             if result:
                 if isinstance(result[0], str):
                     return result[0].strip()
                 return result[0].text_content().strip()
         except Exception as e:
-            logger.warning(f"XPath extraction failed for {xpath}: {e}")
+            logger.warning("XPath extraction failed for %s: %s", xpath, e)
         return None
     
     def parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Parse various date formats."""
         if not date_str:
             return None
+        
+        # ISO 8601 is the common case and ciso8601 parses it in C
+        try:
+            return ciso8601.parse_datetime(date_str.strip())
+        except ValueError:
+            pass
             
         date_formats = [
             '%Y-%m-%d',
@@ -123,31 +180,36 @@ class WebScraper:
         """Scrape a single article."""
         try:
             html = await self.fetch_page(url)
-            soup = BeautifulSoup(html, 'html.parser')
             
-            # Extract using CSS or XPath
+            # Extract using CSS or XPath; each tree is parsed at most once per page
+            css_tree = None
+            xpath_tree = None
             title = None
             content = None
             author = None
             date = None
             
-            for field, selector in selectors.items():
+            for name, selector in selectors.items():
                 if selector.startswith('//'):  # XPath
-                    value = self.extract_with_xpath(html, selector)
+                    if xpath_tree is None:
+                        xpath_tree = lxml.html.fromstring(html)
+                    value = self.extract_with_xpath(xpath_tree, selector)
                 else:  # CSS
-                    value = self.extract_with_css(soup, selector)
+                    if css_tree is None:
+                        css_tree = LexborHTMLParser(html)
+                    value = self.extract_with_css(css_tree, selector)
                 
-                if field == 'title':
+                if name == 'title':
                     title = value
-                elif field == 'content':
+                elif name == 'content':
                     content = value
-                elif field == 'author':
+                elif name == 'author':
                     author = value
-                elif field == 'date':
+                elif name == 'date':
                     date = self.parse_date(value)
             
             if not title or not content:
-                logger.warning(f"Missing required fields for {url}")
+                logger.warning("Missing required fields for %s", url)
                 return None
             
             return Article(
@@ -160,7 +222,7 @@ class WebScraper:
             )
             
         except Exception as e:
-            logger.error(f"Error scraping article {url}: {e}")
+            logger.error("Error scraping article %s: %s", url, e)
             return None
     
     async def scrape_article_list(self, source_config: Dict[str, Any]) -> List[str]:
@@ -181,56 +243,65 @@ class WebScraper:
                 for elem in elements:
                     href = elem.get('href')
                     if href:
-                        urls.append(urljoin(base_url, href))
+                        urls.append(_join_url(base_url, href))
             else:  # CSS
-                soup = BeautifulSoup(html, 'html.parser')
-                elements = soup.select(article_selector)
+                tree = LexborHTMLParser(html)
+                elements = tree.css(article_selector)
                 for elem in elements:
-                    href = elem.get('href') or elem.find('a', href=True)
+                    href = elem.attributes.get('href')
+                    if not href:
+                        link = elem.css_first('a[href]')
+                        href = link.attributes.get('href') if link else None
                     if href:
-                        if isinstance(href, dict):
-                            href = href.get('href')
-                        urls.append(urljoin(base_url, href))
+                        urls.append(_join_url(base_url, href))
             
             return urls[:source_config.get('max_articles', 10)]
             
         except Exception as e:
-            logger.error(f"Error scraping article list from {source_config['url']}: {e}")
+            logger.error("Error scraping article list from %s: %s", source_config['url'], e)
             return []
     
-    async def scrape_source(self, source_config: Dict[str, Any]) -> List[Article]:
-        """Scrape all articles from a source."""
+    async def scrape_source(self, source_config: Dict[str, Any],
+                          is_new: Optional[Callable[[Article], bool]] = None) -> List[Article]:
+        """Scrape all articles from a source, dropping any rejected by is_new."""
         source_name = source_config.get('name', urlparse(source_config['url']).netloc)
         
         # Get article URLs
         article_urls = await self.scrape_article_list(source_config)
-        logger.info(f"Found {len(article_urls)} articles from {source_name}")
+        logger.info("Found %d articles from %s", len(article_urls), source_name)
         
-        # Scrape individual articles with rate limiting
-        articles = []
-        for url in article_urls:
-            article = await self.scrape_article(
-                url, 
-                source_config['selectors'],
-                source_name
-            )
-            if article:
-                articles.append(article)
-            
-            # Rate limiting
-            await asyncio.sleep(self.rate_limit_delay)
+        # Scrape individual articles concurrently under the per-host rate limit
+        results = await asyncio.gather(*[
+            self._scrape_one(url, source_config['selectors'], source_name)
+            for url in article_urls
+        ])
+        
+        return [
+            article for article in results
+            if article and (is_new is None or is_new(article))
+        ]
+    
+    async def _scrape_one(self, url: str, selectors: Dict[str, str],
+                          source_name: str) -> Optional[Article]:
+        """Scrape one article once the host's rate limiter allows it."""
+        if self.rate_limit_delay > 0:
+            limiter = self._host_limiters[urlparse(url).netloc]
+        else:
+            limiter = nullcontext()
         
-        return articles
+        async with limiter:
+            return await self.scrape_article(url, selectors, source_name)
     
-    async def scrape_all_sources(self, sources: List[Dict[str, Any]]) -> List[Article]:
+    async def scrape_all_sources(self, sources: List[Dict[str, Any]],
+                                 is_new: Optional[Callable[[Article], bool]] = None) -> List[Article]:
         """Scrape articles from all configured sources."""
         all_articles = []
         
         for source in sources:
-            logger.info(f"Scraping {source.get('name', source['url'])}")
-            articles = await self.scrape_source(source)
+            logger.info("Scraping %s", source.get('name', source['url']))
+            articles = await self.scrape_source(source, is_new)
             all_articles.extend(articles)
-            logger.info(f"Scraped {len(articles)} articles")
+            logger.info("Scraped %d articles", len(articles))
         
         return all_articles
 
@@ -266,4 +337,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .gpt_summarizer import GPTSummarizer, Summary, NewsletterContent
+from .gpt_summarizer import GPTSummarizer, Summary, NewsletterContent, close_clients
 
-__all__ = ['GPTSummarizer', 'Summary', 'NewsletterContent']
\ No newline at end of file
+__all__ = ['GPTSummarizer', 'Summary', 'NewsletterContent', 'close_clients']
\ No newline at end of file
@@ -1,21 +1,367 @@
 import logging
 import os
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union, Mapping, AsyncIterator, Iterator
 from dataclasses import dataclass
-from collections import Counter
+from collections import Counter, defaultdict
+from itertools import chain, islice
+from datetime import datetime
+from pathlib import Path
 import asyncio
-import json
+import functools
+import re
+import string
+import time
 
+import anthropic
+import blake3
+import httpx
+import msgpack
 import openai
-from anthropic import Anthropic
-from tenacity import retry, stop_after_attempt, wait_exponential
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import TypedDict
+from openai import AsyncOpenAI
+from anthropic import AsyncAnthropic, NOT_GIVEN
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 import tiktoken
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Summaries remembered across runs, oldest dropped first
+SUMMARY_CACHE_SIZE = 5000
 
-@dataclass
+# Texts longer than this are tokenized off the event loop
+LARGE_TEXT_CHARS = 8192
+
+# Responses longer than this are searched for JSON off the event loop
+LARGE_RESPONSE_CHARS = 100_000
+
+# Static part of every summarize prompt; sent ahead of the article so providers can cache it
+SUMMARY_SYSTEM_PROMPT = "You are an expert news analyst and summarizer."
+SUMMARY_INSTRUCTIONS = """
+You are an expert news summarizer. Analyze the article that follows and provide:
+
+1. A short summary (2-3 sentences) capturing the main point
+2. A detailed summary (1-2 paragraphs) with key information
+3. 3-5 key insights or takeaways as bullet points
+4. 3-5 relevant tags/categories
+
+Please format your response as JSON with the following structure:
+{
+    "short_summary": "...",
+    "detailed_summary": "...",
+    "key_insights": ["insight1", "insight2", ...],
+    "tags": ["tag1", "tag2", ...]
+}
+"""
+
+# Cheaper prompt for articles that only need a blurb and tags
+FAST_SUMMARY_INSTRUCTIONS = """
+You are an expert news summarizer. Analyze the article that follows and provide:
+
+1. A short summary (2-3 sentences) capturing the main point
+2. 3-5 relevant tags/categories
+
+Please format your response as JSON with the following structure:
+{
+    "short_summary": "...",
+    "tags": ["tag1", "tag2", ...]
+}
+"""
+FAST_SUMMARY_MAX_TOKENS = 300
+
+# Per-article part of the summarize prompts
+ARTICLE_PROMPT = string.Template("""
+Article Title: ${title}
+Source: ${source}
+Author: ${author}
+
+Content:
+${content}
+""")
+
+_EPHEMERAL = {'type': 'ephemeral'}
+
+# Opts SDK versions that predate GA prompt caching into honouring cache_control;
+# prefixes shorter than the model's minimum (1024 tokens, 2048 on Haiku) are not cached
+_PROMPT_CACHING_HEADERS = {'anthropic-beta': 'prompt-caching-2024-07-31'}
+
+
+class _FastSummaryPayload(TypedDict):
+    """Shape of the JSON the fast summarize prompt asks for."""
+    short_summary: str
+    tags: List[str]
+
+
+class _SummaryPayload(_FastSummaryPayload):
+    """Shape of the JSON the summarize prompt asks for."""
+    detailed_summary: str
+    key_insights: List[str]
+
+
+# Parse and type-check a summarize response in one pass
+_SUMMARY_ADAPTER = TypeAdapter(_SummaryPayload)
+_FAST_SUMMARY_ADAPTER = TypeAdapter(_FastSummaryPayload)
+
+
+class _NewsletterMetaPayload(TypedDict):
+    """Shape of the JSON the newsletter title + insights prompt asks for."""
+    title: str
+    insights: str
+
+
+_NEWSLETTER_META_ADAPTER = TypeAdapter(_NewsletterMetaPayload)
+
+
+def _response_schema(name: str, adapter: TypeAdapter, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Strict JSON schema for the given payload fields, for schema-constrained output."""
+    schema = adapter.json_schema()
+    return {
+        'name': name,
+        'schema': {
+            'type': 'object',
+            'properties': {field: schema['properties'][field] for field in fields},
+            'required': list(fields),
+            'additionalProperties': False
+        }
+    }
+
+
+SUMMARY_SCHEMA = _response_schema(
+    'summary', _SUMMARY_ADAPTER, ('short_summary', 'detailed_summary', 'key_insights', 'tags')
+)
+FAST_SUMMARY_SCHEMA = _response_schema('fast_summary', _FAST_SUMMARY_ADAPTER, ('short_summary', 'tags'))
+NEWSLETTER_META_SCHEMA = _response_schema('newsletter', _NEWSLETTER_META_ADAPTER, ('title', 'insights'))
+
+# OpenAI reports resets as durations such as "1m30s" or "250ms"
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def _parse_reset(value: str) -> float:
+    """Epoch time at which a rate-limit window resets, from a duration or RFC 3339 header."""
+    parts = _DURATION_PART.findall(value)
+    if parts and ''.join(n + u for n, u in parts) == value:
+        return time.time() + sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+    # Anthropic reports the reset instant itself
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def _delta_text(delta) -> str:
+    """Text carried by an Anthropic content delta: answer text or tool-call JSON."""
+    if delta.type == 'text_delta':
+        return delta.text
+    if delta.type == 'input_json_delta':
+        return delta.partial_json
+    return ''
+
+
+def _message_parts(message: Dict[str, Any]) -> List[str]:
+    """A message's content as a list of text parts."""
+    content = message['content']
+    return [content] if isinstance(content, str) else content
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """A message's content as one string, joining text parts."""
+    return ''.join(_message_parts(message))
+
+
+# Failures worth retrying; anything else (bad request, auth, bugs) fails immediately.
+# Transport errors cover connections dropped mid-stream, which the SDKs don't wrap.
+_TRANSIENT_ERRORS = (
+    openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError,
+    anthropic.RateLimitError, anthropic.APIConnectionError, anthropic.InternalServerError,
+    httpx.TransportError,
+)
+
+_BACKOFF = wait_exponential_jitter(initial=1, max=30)
+
+
+def _retry_after_or_backoff(retry_state) -> float:
+    """Wait as long as the provider's Retry-After header asks, else back off with jitter."""
+    response = getattr(retry_state.outcome.exception(), 'response', None)
+    if response is not None:
+        try:
+            return float(response.headers.get('retry-after', ''))
+        except ValueError:
+            pass
+    return _BACKOFF(retry_state)
+
+
+class _JSONObjectEnd:
+    """Finds where the first top-level JSON object in streamed text closes."""
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> int:
+        """Index just past the object's closing brace in text, or -1 while it is still open."""
+        for i, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.depth:
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}' and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return i + 1
+        return -1
+
+
+def _json_objects(text: str) -> Iterator[str]:
+    """Balanced top-level {...} spans in text, in order."""
+    start = text.find('{')
+    while start != -1:
+        end = _JSONObjectEnd().feed(text[start:])
+        if end == -1:
+            return
+        yield text[start:start + end]
+        start = text.find('{', start + end)
+
+
+def _first_valid_json(text: str, adapter: TypeAdapter) -> Optional[Any]:
+    """The first JSON object in text that validates against adapter, or None."""
+    for candidate in _json_objects(text):
+        try:
+            return adapter.validate_json(candidate)
+        except ValidationError as e:
+            logger.debug(f"Skipping JSON candidate: {e}")
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for(model: str) -> tiktoken.Encoding:
+    """Tokenizer for a model, resolved once per process."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@functools.lru_cache(maxsize=1024)
+def _count_tokens(encoding: tiktoken.Encoding, text: str) -> int:
+    """Token count of text; the fixed prompt parts are counted once."""
+    return len(encoding.encode(text))
+
+
+# API clients per (provider, api key), shared by every summarizer in the process
+_CLIENTS: Dict[Tuple[str, Optional[str]], Union[AsyncOpenAI, AsyncAnthropic]] = {}
+
+
+def _api_client(provider: str, api_key: Optional[str]) -> Union[AsyncOpenAI, AsyncAnthropic]:
+    """The process-wide client for a provider and key, with one pooled HTTP/2 connection set."""
+    client = _CLIENTS.get((provider, api_key))
+    if client is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        client_class = AsyncOpenAI if provider == 'openai' else AsyncAnthropic
+        client = _CLIENTS[(provider, api_key)] = client_class(api_key=api_key, http_client=http_client)
+    return client
+
+
+async def close_clients():
+    """Close the shared API clients; call once no summarizer is in use any more."""
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.close()
+
+
+class RateLimiter:
+    """Holds back API calls once the provider reports its request or token allowance spent.
+    
+    With requests_per_minute / tokens_per_minute set, calls are also paced
+    through a token bucket refilled at those rates, so a large batch stays
+    under the limit instead of running into 429s and backing off.
+    """
+    
+    # (remaining, reset) header names per limit, OpenAI first, then Anthropic
+    HEADERS = {
+        'requests': (('x-ratelimit-remaining-requests', 'x-ratelimit-reset-requests'),
+                     ('anthropic-ratelimit-requests-remaining', 'anthropic-ratelimit-requests-reset')),
+        'tokens': (('x-ratelimit-remaining-tokens', 'x-ratelimit-reset-tokens'),
+                   ('anthropic-ratelimit-tokens-remaining', 'anthropic-ratelimit-tokens-reset')),
+    }
+    
+    def __init__(self, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None):
+        self._lock = asyncio.Lock()
+        # None means no allowance reported yet (or the window has reset)
+        self.remaining: Dict[str, Optional[int]] = {'requests': None, 'tokens': None}
+        self.reset_at: Dict[str, float] = {'requests': 0.0, 'tokens': 0.0}
+        
+        # Client-side budget; a bucket starts full and refills continuously
+        self.per_minute: Dict[str, Optional[int]] = {'requests': requests_per_minute,
+                                                     'tokens': tokens_per_minute}
+        self.available: Dict[str, float] = {limit: float(capacity or 0)
+                                            for limit, capacity in self.per_minute.items()}
+        self._refilled_at = time.monotonic()
+    
+    def _refill(self):
+        """Top up the budget buckets for the time since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        for limit, capacity in self.per_minute.items():
+            if capacity:
+                self.available[limit] = min(capacity, self.available[limit] + elapsed * capacity / 60)
+    
+    async def acquire(self, estimated_tokens: int):
+        """Wait until one request of about estimated_tokens fits the budget and reported allowance."""
+        async with self._lock:
+            for limit, needed in (('requests', 1), ('tokens', estimated_tokens)):
+                capacity = self.per_minute[limit]
+                if capacity:
+                    # A request bigger than the whole bucket waits for a full one
+                    needed_now = min(needed, capacity)
+                    self._refill()
+                    if self.available[limit] < needed_now:
+                        await asyncio.sleep((needed_now - self.available[limit]) * 60 / capacity)
+                        self._refill()
+                    self.available[limit] -= needed_now
+                
+                remaining = self.remaining[limit]
+                if remaining is None:
+                    continue
+                if remaining < needed:
+                    delay = self.reset_at[limit] - time.time()
+                    if delay > 0:
+                        logger.warning(f"LLM {limit} limit reached, waiting {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                    # New window; the next response reports the real allowance
+                    self.remaining[limit] = None
+                else:
+                    self.remaining[limit] = remaining - needed
+    
+    def update(self, headers: Mapping[str, str]):
+        """Record the allowance reported by rate-limit response headers."""
+        for limit, names in self.HEADERS.items():
+            for remaining_name, reset_name in names:
+                remaining = headers.get(remaining_name)
+                if remaining is None:
+                    continue
+                self.remaining[limit] = int(remaining)
+                reset = headers.get(reset_name)
+                if reset:
+                    try:
+                        self.reset_at[limit] = _parse_reset(reset)
+                    except ValueError:
+                        pass
+                break
+
+
+@dataclass(slots=True)
 class Summary:
     short_summary: str  # 2-3 sentences
     detailed_summary: str  # Comprehensive summary
@@ -31,7 +377,7 @@ class Summary:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class NewsletterContent:
     title: str
     introduction: str
@@ -50,35 +396,128 @@ class NewsletterContent:
 
 
 class GPTSummarizer:
-    def __init__(self, config: Dict[str, Any]):
+    # Stories the newsletter title, insights and trends are drawn from
+    NEWSLETTER_STORIES = 10
+    
+    def __init__(self, config: Dict[str, Any], client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self.model = config.get('model', 'gpt-4')
         self.temperature = config.get('temperature', 0.7)
         self.max_tokens = config.get('max_tokens', 2000)
         
-        # Initialize API client based on provider
+        # Bounds in-flight API calls across every summarize/newsletter request
+        self.semaphore = asyncio.Semaphore(config.get('max_concurrent_requests', 16))
+        # Fed from the provider's rate-limit headers so bursts wait instead of hitting 429s;
+        # providers meter each model separately
+        # requests_per_minute / tokens_per_minute, if set, pace calls ahead of the headers
+        self.rate_limiters = defaultdict(functools.partial(
+            RateLimiter,
+            config.get('requests_per_minute'),
+            config.get('tokens_per_minute')
+        ))
+        
+        # Summaries of articles already seen, keyed on model + schema + temperature + title + truncated content
+        self.summary_cache_enabled = config.get('summary_cache', True)
+        # Refresh skips cached summaries but still stores the new ones
+        self.summary_cache_refresh = config.get('summary_cache_refresh', False)
+        self.summary_cache_path = Path(config.get('summary_cache_path', './cache/summaries.msgpack'))
+        # Each new summary is appended here right away so a crashed run can resume
+        self.summary_journal_path = self.summary_cache_path.with_suffix('.journal')
+        self._summary_cache = self._load_summary_cache() if self.summary_cache_enabled else {}
+        self._summary_cache_dirty = self.summary_cache_enabled and self.summary_journal_path.exists()
+        
+        # Initialize API client based on provider. Without a caller's HTTP client (which
+        # stays owned by the caller), summarizers share one API client per key
         self.provider = config.get('provider', 'openai')
         if self.provider == 'openai':
             api_key = os.getenv(config.get('api_key_env', 'OPENAI_API_KEY'))
-            openai.api_key = api_key
-            self.client = openai
+            self.client = AsyncOpenAI(api_key=api_key, http_client=client) if client else _api_client('openai', api_key)
         elif self.provider == 'anthropic':
             api_key = os.getenv(config.get('api_key_env', 'ANTHROPIC_API_KEY'))
-            self.client = Anthropic(api_key=api_key)
+            self.client = AsyncAnthropic(api_key=api_key, http_client=client) if client else _api_client('anthropic', api_key)
             self.model = config.get('model', 'claude-3-opus-20240229')
         
+        # Optional cheaper model for articles outside the newsletter's top stories
+        self.fast_model = config.get('fast_model')
+        
+        # OpenAI's json_schema response format needs gpt-4o-2024-08-06 or newer, so it is
+        # opt-in; Anthropic answers JSON prompts through a forced tool call on every model
+        self.structured_output = config.get('structured_output', False)
+        
         # Initialize tokenizer for content truncation
+        self.encoding = _encoding_for(self.model if self.provider == 'openai' else 'gpt-4')
+    
+    def _load_summary_cache(self) -> Dict[bytes, Dict[str, Any]]:
+        """Load cached summaries from disk, replaying any checkpointed since the last save."""
+        cache = {}
+        try:
+            if self.summary_cache_path.exists():
+                cache = msgpack.unpackb(self.summary_cache_path.read_bytes(), raw=False)
+        except Exception as e:
+            logger.warning(f"Failed to load summary cache: {e}")
+        
+        try:
+            if self.summary_journal_path.exists():
+                with open(self.summary_journal_path, 'rb') as f:
+                    # A record cut short by a crash is simply not yielded
+                    for key, data in msgpack.Unpacker(f, raw=False):
+                        cache.pop(key, None)
+                        cache[key] = data
+                while len(cache) > SUMMARY_CACHE_SIZE:
+                    del cache[next(iter(cache))]
+        except Exception as e:
+            logger.warning(f"Failed to replay summary checkpoints: {e}")
+        return cache
+    
+    def save_summary_cache(self):
+        """Save cached summaries to disk if any were added."""
+        if not self._summary_cache_dirty:
+            return
+        
+        try:
+            self.summary_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.summary_cache_path.with_suffix('.tmp')
+            tmp_file.write_bytes(msgpack.packb(self._summary_cache, use_bin_type=True))
+            os.replace(tmp_file, self.summary_cache_path)
+            self.summary_journal_path.unlink(missing_ok=True)
+            self._summary_cache_dirty = False
+        except Exception as e:
+            logger.warning(f"Failed to save summary cache: {e}")
+    
+    def _summary_key(self, model: str, schema_name: str, title: str, content: str) -> bytes:
+        """Cache key for a summary of this content in this schema by this model at this temperature."""
+        hasher = blake3.blake3()
+        for part in (self.provider, model, schema_name, f'{self.temperature:.3f}', title, content):
+            hasher.update(part.encode())
+            hasher.update(b'\x00')
+        return hasher.digest(length=16)
+    
+    def _remember_summary(self, key: bytes, summary: 'Summary'):
+        """Cache a summary, dropping the oldest entries past the limit."""
+        data = summary.to_dict()
+        self._summary_cache[key] = data
+        while len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+            del self._summary_cache[next(iter(self._summary_cache))]
+        self._summary_cache_dirty = True
+        
+        # Checkpoint with one small append instead of rewriting the whole cache
         try:
-            self.encoding = tiktoken.encoding_for_model(self.model if self.provider == 'openai' else 'gpt-4')
-        except:
-            self.encoding = tiktoken.get_encoding("cl100k_base")
+            self.summary_journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.summary_journal_path, 'ab') as f:
+                f.write(msgpack.packb([key, data], use_bin_type=True))
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint summary: {e}")
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
-        return len(self.encoding.encode(text))
+        return _count_tokens(self.encoding, text)
     
     def truncate_content(self, content: str, max_tokens: int = 3000) -> str:
         """Truncate content to fit within token limit."""
+        # News text runs about 4 bytes per token; well under budget needs no tokenizing
+        if len(content.encode('utf-8')) < max_tokens * 3:
+            return content
+        
         tokens = self.encoding.encode(content)
         if len(tokens) <= max_tokens:
             return content
@@ -86,98 +525,216 @@ class GPTSummarizer:
         truncated_tokens = tokens[:max_tokens]
         return self.encoding.decode(truncated_tokens)
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    async def _call_api(self, messages: List[Dict[str, str]], 
-                       max_tokens: Optional[int] = None) -> str:
-        """Call the AI API with retry logic."""
+    def truncate_contents(self, contents: List[str], max_tokens: int = 3000) -> List[str]:
+        """Truncate many texts at once, tokenizing the long ones in parallel."""
+        truncated = list(contents)
+        long_indexes = [i for i, content in enumerate(contents)
+                        if len(content.encode('utf-8')) >= max_tokens * 3]
+        if not long_indexes:
+            return truncated
+        
+        # tiktoken releases the GIL and spreads the batch over its own threads
+        tokens_batch = self.encoding.encode_ordinary_batch(
+            [contents[i] for i in long_indexes], num_threads=os.cpu_count() or 1
+        )
+        over = [(i, tokens[:max_tokens]) for i, tokens in zip(long_indexes, tokens_batch)
+                if len(tokens) > max_tokens]
+        if over:
+            decoded = self.encoding.decode_batch([tokens for _, tokens in over],
+                                                 num_threads=os.cpu_count() or 1)
+            for (i, _), text in zip(over, decoded):
+                truncated[i] = text
+        return truncated
+    
+    @retry(
+        retry=retry_if_exception_type(_TRANSIENT_ERRORS),
+        wait=_retry_after_or_backoff,
+        stop=stop_after_attempt(5),
+        reraise=True
+    )
+    async def _call_api(self, messages: List[Dict[str, Any]], 
+                       max_tokens: Optional[int] = None,
+                       stop_at_json: bool = False,
+                       model: Optional[str] = None,
+                       schema: Optional[Dict[str, Any]] = None) -> str:
+        """Call the AI API with retry logic.
+        
+        A message's content may be a list of text parts; for Anthropic every
+        part but the last is marked as a cacheable prompt prefix. Responses are
+        streamed; with stop_at_json the stream is closed as soon as the first
+        JSON object in it is complete. model overrides the configured model.
+        With a schema (see _response_schema) the provider is asked to answer
+        with JSON matching it, which is returned as the response text.
+        """
+        model = model or self.model
+        rate_limiter = self.rate_limiters[model]
         try:
-            if self.provider == 'openai':
-                response = await asyncio.to_thread(
-                    self.client.ChatCompletion.create,
-                    model=self.model,
-                    messages=messages,
-                    temperature=self.temperature,
-                    max_tokens=max_tokens or self.max_tokens
-                )
-                return response.choices[0].message.content
-            
-            elif self.provider == 'anthropic':
-                # Extract system message if present
-                system_message = None
-                user_messages = []
-                
+            async with self.semaphore:
+                # Counted per part so the shared instruction prefix hits the count cache
+                prompt_tokens = 0
                 for msg in messages:
-                    if msg['role'] == 'system':
-                        system_message = msg['content']
-                    else:
-                        user_messages.append(msg)
+                    for part in _message_parts(msg):
+                        if len(part) > LARGE_TEXT_CHARS:
+                            prompt_tokens += await asyncio.to_thread(self.count_tokens, part)
+                        else:
+                            prompt_tokens += self.count_tokens(part)
+                await rate_limiter.acquire(prompt_tokens + (max_tokens or self.max_tokens))
                 
-                response = await asyncio.to_thread(
-                    self.client.messages.create,
-                    model=self.model,
-                    messages=user_messages,
-                    system=system_message,
-                    temperature=self.temperature,
-                    max_tokens=max_tokens or self.max_tokens
-                )
-                return response.content[0].text
+                if self.provider == 'openai':
+                    response_format = openai.NOT_GIVEN
+                    if schema is not None and self.structured_output:
+                        response_format = {'type': 'json_schema', 'json_schema': {**schema, 'strict': True}}
+                    
+                    raw = await self.client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=[{'role': msg['role'], 'content': _message_text(msg)} for msg in messages],
+                        temperature=self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        response_format=response_format,
+                        stream=True
+                    )
+                    rate_limiter.update(raw.headers)
+                    stream = raw.parse()
+                    deltas = (chunk.choices[0].delta.content or ''
+                              async for chunk in stream if chunk.choices)
+                    return await self._read_stream(stream, deltas, stop_at_json)
+                
+                elif self.provider == 'anthropic':
+                    # Extract system message if present; it is identical across calls, so cache it
+                    system = NOT_GIVEN
+                    user_messages = []
+                    
+                    for msg in messages:
+                        if msg['role'] == 'system':
+                            system = [{'type': 'text', 'text': msg['content'], 'cache_control': _EPHEMERAL}]
+                        elif isinstance(msg['content'], list):
+                            *prefix, last = msg['content']
+                            blocks = [{'type': 'text', 'text': part} for part in prefix]
+                            if blocks:
+                                blocks[-1]['cache_control'] = _EPHEMERAL
+                            blocks.append({'type': 'text', 'text': last})
+                            user_messages.append({'role': msg['role'], 'content': blocks})
+                        else:
+                            user_messages.append(msg)
+                    
+                    # A forced tool call makes Claude answer with JSON matching the schema
+                    tools = tool_choice = NOT_GIVEN
+                    if schema is not None:
+                        tools = [{'name': schema['name'], 'input_schema': schema['schema']}]
+                        tool_choice = {'type': 'tool', 'name': schema['name']}
+                    
+                    raw = await self.client.messages.with_raw_response.create(
+                        model=model,
+                        messages=user_messages,
+                        system=system,
+                        temperature=self.temperature,
+                        max_tokens=max_tokens or self.max_tokens,
+                        tools=tools,
+                        tool_choice=tool_choice,
+                        stream=True,
+                        extra_headers=_PROMPT_CACHING_HEADERS
+                    )
+                    rate_limiter.update(raw.headers)
+                    stream = raw.parse()
+                    deltas = (_delta_text(event.delta) async for event in stream
+                              if event.type == 'content_block_delta')
+                    return await self._read_stream(stream, deltas, stop_at_json)
                 
         except Exception as e:
+            # 429s carry the same headers; record them so the retry waits for the window
+            response = getattr(e, 'response', None)
+            if response is not None:
+                rate_limiter.update(response.headers)
             logger.error(f"API call failed: {e}")
             raise
     
-    async def summarize_article(self, article: Dict[str, Any]) -> Summary:
-        """Generate comprehensive summary for a single article."""
-        content = self.truncate_content(article['content'])
+    async def _read_stream(self, stream, deltas: AsyncIterator[str], stop_at_json: bool) -> str:
+        """Collect streamed response text, closing the stream early once a JSON answer is complete."""
+        parts = []
+        json_end = _JSONObjectEnd() if stop_at_json else None
+        try:
+            async for text in deltas:
+                if json_end is not None:
+                    end = json_end.feed(text)
+                    if end != -1:
+                        parts.append(text[:end])
+                        break
+                parts.append(text)
+        finally:
+            await stream.close()
+        return ''.join(parts)
+    
+    async def _parse_json(self, response: str, adapter: TypeAdapter) -> Optional[Any]:
+        """The first JSON object in a response that fits adapter's schema, or None."""
+        if len(response) > LARGE_RESPONSE_CHARS:
+            return await asyncio.to_thread(_first_valid_json, response, adapter)
+        return _first_valid_json(response, adapter)
+    
+    async def summarize_article(self, article: Dict[str, Any],
+                                content: Optional[str] = None) -> Summary:
+        """Generate comprehensive summary for a single article.
         
-        prompt = f"""
-You are an expert news summarizer. Analyze the following article and provide:
-
-1. A short summary (2-3 sentences) capturing the main point
-2. A detailed summary (1-2 paragraphs) with key information
-3. 3-5 key insights or takeaways as bullet points
-4. 3-5 relevant tags/categories
-
-Article Title: {article['title']}
-Source: {article['source_name']}
-Author: {article.get('author', 'Unknown')}
-
-Content:
-{content}
-
-Please format your response as JSON with the following structure:
-{{
-    "short_summary": "...",
-    "detailed_summary": "...",
-    "key_insights": ["insight1", "insight2", ...],
-    "tags": ["tag1", "tag2", ...]
-}}
-"""
+        content, if given, is the article's already truncated text.
+        """
+        return await self._summarize(article, self.model, SUMMARY_INSTRUCTIONS, SUMMARY_SCHEMA,
+                                     _SUMMARY_ADAPTER, content=content)
+    
+    async def summarize_article_fast(self, article: Dict[str, Any],
+                                     content: Optional[str] = None) -> Summary:
+        """Generate just a short summary and tags with the fast model."""
+        return await self._summarize(article, self.fast_model, FAST_SUMMARY_INSTRUCTIONS,
+                                     FAST_SUMMARY_SCHEMA, _FAST_SUMMARY_ADAPTER,
+                                     max_tokens=FAST_SUMMARY_MAX_TOKENS,
+                                     content=content)
+    
+    async def _summarize(self, article: Dict[str, Any], model: str, instructions: str,
+                         schema: Dict[str, Any], adapter: TypeAdapter,
+                         max_tokens: Optional[int] = None,
+                         content: Optional[str] = None) -> Summary:
+        """Summarize an article with the given model and instructions."""
+        # Long articles are tokenized in a worker thread so other API calls keep moving
+        if content is None and len(article['content']) > LARGE_TEXT_CHARS:
+            content = await asyncio.to_thread(self.truncate_content, article['content'])
+        elif content is None:
+            content = self.truncate_content(article['content'])
+        
+        # Syndicated stories recur across feeds and days; reuse their summaries
+        cache_key = self._summary_key(model, schema['name'], article['title'], content)
+        cached = None
+        if self.summary_cache_enabled and not self.summary_cache_refresh:
+            cached = self._summary_cache.get(cache_key)
+        if cached is not None:
+            return Summary(**cached)
+        
+        article_prompt = ARTICLE_PROMPT.safe_substitute(
+            title=article['title'],
+            source=article['source_name'],
+            author=article.get('author', 'Unknown'),
+            content=content
+        )
         
         messages = [
-            {"role": "system", "content": "You are an expert news analyst and summarizer."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": [instructions, article_prompt]}
         ]
         
-        response = await self._call_api(messages)
+        response = await self._call_api(messages, max_tokens, stop_at_json=True, model=model, schema=schema)
         
-        try:
-            # Try to extract JSON from response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                data = json.loads(json_str)
-                
-                return Summary(
-                    short_summary=data.get('short_summary', '')[:500],
-                    detailed_summary=data.get('detailed_summary', ''),
-                    key_insights=data.get('key_insights', [])[:5],
-                    tags=data.get('tags', [])[:5]
-                )
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Failed to parse JSON response: {e}")
+        # Try to extract JSON from response
+        data = await self._parse_json(response, adapter)
+        if data is not None:
+            summary = Summary(
+                short_summary=data.get('short_summary', '')[:500],
+                detailed_summary=data.get('detailed_summary', ''),
+                key_insights=data.get('key_insights', [])[:5],
+                tags=data.get('tags', [])[:5]
+            )
+            # An empty answer is worth retrying next run, not remembering
+            if self.summary_cache_enabled and summary.short_summary.strip():
+                self._remember_summary(cache_key, summary)
+            return summary
+        
+        logger.warning("Failed to parse JSON response")
         
         # Fallback parsing if JSON fails
         lines = response.split('\n')
@@ -190,16 +747,8 @@ Please format your response as JSON with the following structure:
     
     def extract_trends(self, summaries: List[Tuple[Dict[str, Any], Summary]]) -> List[str]:
         """Extract trending topics and themes from multiple summaries."""
-        # Collect all tags and key terms
-        all_tags = []
-        all_insights = []
-        
-        for article, summary in summaries:
-            all_tags.extend(summary.tags)
-            all_insights.extend(summary.key_insights)
-        
-        # Count tag frequency
-        tag_counts = Counter(all_tags)
+        # Count tag frequency straight from the summaries
+        tag_counts = Counter(chain.from_iterable(summary.tags for _, summary in summaries))
         
         # Extract top trends
         trends = []
@@ -243,16 +792,14 @@ Provide only the title, no explanation.
                                niche: str) -> str:
         """Generate overall insights and analysis."""
         # Prepare insights data
-        all_insights = []
-        for article, summary in summaries[:10]:
-            all_insights.extend(summary.key_insights)
+        top_insights = islice(chain.from_iterable(summary.key_insights for _, summary in summaries[:10]), 20)
         
         prompt = f"""
 Based on the following key insights from today's {niche} news, provide a brief analysis
 of the overall trends, patterns, and what they mean for the industry.
 
 Key insights:
-{chr(10).join(f"- {insight}" for insight in all_insights[:20])}
+{chr(10).join(f"- {insight}" for insight in top_insights)}
 
 Write 2-3 paragraphs of thoughtful analysis. Focus on:
 1. Major themes and patterns
@@ -269,25 +816,73 @@ Keep it concise and insightful.
         
         return await self._call_api(messages)
     
+    async def generate_newsletter_meta(self, summaries: List[Tuple[Dict[str, Any], Summary]],
+                                       niche: str) -> Tuple[str, str]:
+        """Generate the newsletter title and insights with a single API call."""
+        top_topics = [summary.tags[0] for _, summary in summaries[:5] if summary.tags]
+        
+        top_insights = islice(chain.from_iterable(summary.key_insights for _, summary in summaries[:10]), 20)
+        
+        prompt = f"""
+You are preparing today's {niche} news digest.
+
+Top topics covered: {', '.join(top_topics[:3])}
+
+Key insights:
+{chr(10).join(f"- {insight}" for insight in top_insights)}
+
+Provide:
+1. "title": an engaging, professional newsletter title - catchy but professional,
+   includes the niche ({niche}), under 10 words, relevant to current news cycle
+2. "insights": 2-3 paragraphs of thoughtful analysis of the overall trends, patterns,
+   and what they mean for the industry. Focus on major themes and patterns, what this
+   means for the future, and action items for readers. Keep it concise and insightful.
+
+Please format your response as JSON with the following structure:
+{{
+    "title": "...",
+    "insights": "..."
+}}
+"""
+        
+        messages = [
+            {"role": "system", "content": f"You are a professional newsletter editor and expert {niche} industry analyst."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        response = await self._call_api(messages, stop_at_json=True, schema=NEWSLETTER_META_SCHEMA)
+        
+        data = await self._parse_json(response, _NEWSLETTER_META_ADAPTER)
+        if data is not None:
+            return data['title'].strip().strip('"').strip("'"), data['insights']
+        
+        logger.warning("Failed to parse newsletter JSON response")
+        
+        # Fall back to asking for each part separately
+        title, insights = await asyncio.gather(
+            self.generate_newsletter_title(niche, [summary for _, summary in summaries]),
+            self.generate_insights(summaries, niche)
+        )
+        return title, insights
+    
     async def create_newsletter_content(self, 
                                       articles_with_summaries: List[Tuple[Dict[str, Any], Summary]],
-                                      niche: str) -> NewsletterContent:
-        """Create complete newsletter content."""
-        # Sort by relevance/quality (you could implement a scoring system)
-        sorted_articles = articles_with_summaries[:10]  # Top 10 stories
+                                      niche: str,
+                                      meta: Optional[Tuple[str, str]] = None) -> NewsletterContent:
+        """Create complete newsletter content.
         
-        # Generate newsletter components
-        summaries = [summary for _, summary in sorted_articles]
+        meta is the (title, insights) pair from generate_newsletter_meta, if it
+        was already requested for these top stories.
+        """
+        # Sort by relevance/quality (you could implement a scoring system)
+        sorted_articles = articles_with_summaries[:self.NEWSLETTER_STORIES]  # Top 10 stories
         
-        # Generate title
-        title = await self.generate_newsletter_title(niche, summaries)
+        # Generate title and insights together
+        title, insights = meta or await self.generate_newsletter_meta(sorted_articles, niche)
         
         # Extract trends
         trends = self.extract_trends(sorted_articles)
         
-        # Generate insights
-        insights = await self.generate_insights(sorted_articles, niche)
-        
         # Create introduction
         introduction = f"Welcome to today's {niche} news digest! We've analyzed {len(articles_with_summaries)} articles to bring you the most important developments and insights."
         
@@ -310,27 +905,50 @@ Keep it concise and insightful.
             insights=insights
         )
     
-    async def process_articles(self, articles: List[Dict[str, Any]], 
-                             max_articles: Optional[int] = None) -> List[Tuple[Dict[str, Any], Summary]]:
-        """Process multiple articles with summaries."""
+    async def process_articles(self, articles: Union[List[Dict[str, Any]], Dict[str, List[Any]]], 
+                             max_articles: Optional[int] = None,
+                             full_count: Optional[int] = None) -> List[Tuple[Dict[str, Any], Summary]]:
+        """Process multiple articles with summaries.
+        
+        Accepts either a list of article dicts or a columnar dict of lists
+        (see Article.to_columns). When a fast model is configured, only the
+        first full_count articles (all, if None) get a full summary; the rest
+        get a short summary and tags from the fast model.
+        """
+        if isinstance(articles, dict):
+            fields = list(articles)
+            columns = [articles[field] for field in fields]
+            articles = [
+                {field: column[i] for field, column in zip(fields, columns)}
+                for i in range(len(columns[0]) if columns else 0)
+            ]
+        
         if max_articles:
             articles = articles[:max_articles]
         
-        # Process articles concurrently in batches
-        batch_size = 5
-        all_summaries = []
+        # Tokenize the whole batch up front rather than one article per call
+        contents = await asyncio.to_thread(self.truncate_contents, [a['content'] for a in articles])
         
-        for i in range(0, len(articles), batch_size):
-            batch = articles[i:i + batch_size]
-            tasks = [self.summarize_article(article) for article in batch]
-            summaries = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for article, summary in zip(batch, summaries):
-                if isinstance(summary, Summary):
-                    all_summaries.append((article, summary))
-                else:
-                    logger.error(f"Failed to summarize article: {article['title']}")
+        # Process all articles concurrently; the API semaphore keeps the pipe full without bursting
+        if self.fast_model is None or full_count is None:
+            full_count = len(articles)
+        summaries = await asyncio.gather(
+            *(
+                self.summarize_article(article, content) if i < full_count
+                else self.summarize_article_fast(article, content)
+                for i, (article, content) in enumerate(zip(articles, contents))
+            ),
+            return_exceptions=True
+        )
+        
+        all_summaries = []
+        for article, summary in zip(articles, summaries):
+            if isinstance(summary, Summary):
+                all_summaries.append((article, summary))
+            else:
+                logger.error(f"Failed to summarize article: {article['title']}")
         
+        await asyncio.to_thread(self.save_summary_cache)
         return all_summaries
 
 
@@ -365,4 +983,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
\ No newline at end of file
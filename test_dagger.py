@@ -14,29 +14,34 @@ import dagger
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent))
 
+# Everything any module test needs, installed once into the shared base container
+ALL_DEPS = [
+    "httpx[http2]", "selectolax", "lxml", "feedparser", "python-dateutil",
+    "openai", "anthropic", "tiktoken", "tenacity", "jinja2", "pyyaml", "cachetools", "blake3", "aiolimiter", "ciso8601",
+    "msgpack", "orjson", "pybloom-live", "pydantic", "typing_extensions", "dagger-io", "pygit2", "oauthlib"
+]
 
-async def test_scraper_module():
+
+def build_base(client: dagger.Client) -> dagger.Container:
+    """Build the container shared by all tests: dependencies and source code."""
+    src_dir = client.host().directory("./src", exclude=["**/__pycache__"])
+    return (
+        client.container()
+        .from_("python:3.11-slim")
+        .with_exec(["apt-get", "update", "-qq"])
+        .with_exec(["apt-get", "install", "-y", "-qq", "git"])
+        .with_exec(["pip", "install", "-q", *ALL_DEPS])
+        .with_directory("/app/src", src_dir)
+        .with_workdir("/app")
+    )
+
+
+async def test_scraper_module(client: dagger.Client, base: dagger.Container):
     """Test the scraper module in a Dagger container."""
     print("🧪 Testing Scraper Module...")
     
-    async with dagger.connect() as client:
-        # Create container with scraper dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["apt-get", "update", "-qq"])
-            .with_exec(["apt-get", "install", "-y", "-qq", "git"])
-            .with_exec(["pip", "install", "-q", "httpx", "beautifulsoup4", "lxml", 
-                       "feedparser", "python-dateutil", "tenacity"])
-        )
-        
-        # Mount source code
-        src_dir = client.host().directory("./src", exclude=["**/__pycache__"])
-        container = container.with_directory("/app/src", src_dir)
-        container = container.with_workdir("/app")
-        
-        # Test RSS parsing
-        test_script = """
+    # Test RSS parsing
+    test_script = """
 import asyncio
 from src.scrapers.rss_parser import RSSParser
 
@@ -49,6 +54,7 @@ async def test():
         'max_articles': 3
     }]
     articles = await parser.parse_all_feeds(feeds)
+    await parser.aclose()
     print(f"✅ Parsed {len(articles)} articles from RSS feeds")
     for article in articles[:2]:
         print(f"  - {article.title[:60]}...")
@@ -56,17 +62,17 @@ async def test():
 
 asyncio.run(test())
 """
-        
-        # Run test
-        result = await container.with_exec(["python", "-c", test_script]).sync()
-        
-        if result:
-            print("✅ Scraper module test passed!\n")
-        else:
-            print("❌ Scraper module test failed!\n")
+    
+    # Run test
+    result = await base.with_exec(["python", "-c", test_script]).sync()
+    
+    if result:
+        print("✅ Scraper module test passed!\n")
+    else:
+        print("❌ Scraper module test failed!\n")
 
 
-async def test_summarizer_module():
+async def test_summarizer_module(client: dagger.Client, base: dagger.Container):
     """Test the summarizer module with Claude API."""
     print("🧪 Testing Summarizer Module...")
     
@@ -76,22 +82,10 @@ async def test_summarizer_module():
         print("Please set it in your .env file or environment")
         return
     
-    async with dagger.connect() as client:
-        # Create container with AI dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["pip", "install", "-q", "anthropic", "tiktoken", "tenacity"])
-            .with_env_variable("ANTHROPIC_API_KEY", os.environ['ANTHROPIC_API_KEY'])
-        )
-        
-        # Mount source code
-        src_dir = client.host().directory("./src", exclude=["**/__pycache__"])
-        container = container.with_directory("/app/src", src_dir)
-        container = container.with_workdir("/app")
-        
-        # Test summarization
-        test_script = """
+    container = base.with_env_variable("ANTHROPIC_API_KEY", os.environ['ANTHROPIC_API_KEY'])
+    
+    # Test summarization
+    test_script = """
 import asyncio
 from src.summarizers.gpt_summarizer import GPTSummarizer
 
@@ -125,39 +119,26 @@ async def test():
 
 asyncio.run(test())
 """
-        
-        # Run test
-        result = await container.with_exec(["python", "-c", test_script]).sync()
-        
-        if result:
-            print("✅ Summarizer module test passed!\n")
-        else:
-            print("❌ Summarizer module test failed!\n")
+    
+    # Run test
+    result = await container.with_exec(["python", "-c", test_script]).sync()
+    
+    if result:
+        print("✅ Summarizer module test passed!\n")
+    else:
+        print("❌ Summarizer module test failed!\n")
 
 
-async def test_publisher_module():
+async def test_publisher_module(client: dagger.Client, base: dagger.Container):
     """Test the publisher module."""
     print("🧪 Testing Publisher Module...")
     
-    async with dagger.connect() as client:
-        # Create container with publishing dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["pip", "install", "-q", "jinja2"])
-        )
-        
-        # Mount source code and templates
-        src_dir = client.host().directory("./src", exclude=["**/__pycache__"])
-        container = container.with_directory("/app/src", src_dir)
-        
-        templates_dir = client.host().directory("./templates")
-        container = container.with_directory("/app/templates", templates_dir)
-        
-        container = container.with_workdir("/app")
-        
-        # Test markdown publishing
-        test_script = """
+    # Mount templates
+    templates_dir = client.host().directory("./templates")
+    container = base.with_directory("/app/templates", templates_dir)
+    
+    # Test markdown publishing
+    test_script = """
 from src.publishers.markdown_publisher import MarkdownPublisher
 import os
 
@@ -210,17 +191,17 @@ try:
 except Exception as e:
     print(f"❌ Publishing failed: {e}")
 """
-        
-        # Run test
-        result = await container.with_exec(["python", "-c", test_script]).sync()
-        
-        if result:
-            print("✅ Publisher module test passed!\n")
-        else:
-            print("❌ Publisher module test failed!\n")
+    
+    # Run test
+    result = await container.with_exec(["python", "-c", test_script]).sync()
+    
+    if result:
+        print("✅ Publisher module test passed!\n")
+    else:
+        print("❌ Publisher module test failed!\n")
 
 
-async def test_full_pipeline():
+async def test_full_pipeline(client: dagger.Client, base: dagger.Container):
     """Test the full pipeline with minimal data."""
     print("🧪 Testing Full Pipeline...")
     
@@ -230,38 +211,22 @@ async def test_full_pipeline():
         print("Please set it in your .env file or environment")
         return
     
-    async with dagger.connect() as client:
-        # Create container with all dependencies
-        container = (
-            client.container()
-            .from_("python:3.11-slim")
-            .with_exec(["apt-get", "update", "-qq"])
-            .with_exec(["apt-get", "install", "-y", "-qq", "git"])
-            .with_exec(["pip", "install", "-q"] + [
-                "httpx", "beautifulsoup4", "lxml", "feedparser", "python-dateutil",
-                "anthropic", "tiktoken", "tenacity", "jinja2", "pyyaml", "cachetools"
-            ])
-            .with_env_variable("ANTHROPIC_API_KEY", os.environ['ANTHROPIC_API_KEY'])
-        )
-        
-        # Mount all necessary directories
-        src_dir = client.host().directory("./src", exclude=["**/__pycache__"])
-        config_dir = client.host().directory("./config")
-        templates_dir = client.host().directory("./templates")
-        
-        container = (
-            container
-            .with_directory("/app/src", src_dir)
-            .with_directory("/app/config", config_dir)
-            .with_directory("/app/templates", templates_dir)
-            .with_workdir("/app")
-        )
-        
-        # Create necessary directories
-        container = container.with_exec(["mkdir", "-p", "/app/output", "/app/cache", "/app/metrics"])
-        
-        # Run minimal pipeline test
-        test_script = """
+    # Mount config and templates
+    config_dir = client.host().directory("./config")
+    templates_dir = client.host().directory("./templates")
+    
+    container = (
+        base
+        .with_env_variable("ANTHROPIC_API_KEY", os.environ['ANTHROPIC_API_KEY'])
+        .with_directory("/app/config", config_dir)
+        .with_directory("/app/templates", templates_dir)
+    )
+    
+    # Create necessary directories
+    container = container.with_exec(["mkdir", "-p", "/app/output", "/app/cache", "/app/metrics"])
+    
+    # Run minimal pipeline test
+    test_script = """
 import asyncio
 import sys
 sys.path.append('/app')
@@ -319,14 +284,14 @@ except Exception as e:
     print(f"❌ Pipeline test failed: {e}")
     sys.exit(1)
 """
-        
-        # Run test
-        result = await container.with_exec(["python", "-c", test_script]).sync()
-        
-        if result:
-            print("✅ Full pipeline test passed!\n")
-        else:
-            print("❌ Full pipeline test failed!\n")
+    
+    # Run test
+    result = await container.with_exec(["python", "-c", test_script]).sync()
+    
+    if result:
+        print("✅ Full pipeline test passed!\n")
+    else:
+        print("❌ Full pipeline test failed!\n")
 
 
 async def main():
@@ -334,11 +299,15 @@ async def main():
     print("🚀 AI News Summarizer - Dagger Test Suite\n")
     print("This will test each module in isolated containers using Dagger.\n")
     
-    # Test each module
-    await test_scraper_module()
-    await test_summarizer_module()
-    await test_publisher_module()
-    await test_full_pipeline()
+    # One connection and one base container for every test; only the first build pays for pip
+    async with dagger.connect() as client:
+        base = build_base(client)
+        
+        # Test each module
+        await test_scraper_module(client, base)
+        await test_summarizer_module(client, base)
+        await test_publisher_module(client, base)
+        await test_full_pipeline(client, base)
     
     print("\n✨ All Dagger tests completed!")
     print("\nTo run the actual pipeline with Dagger:")
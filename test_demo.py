@@ -53,6 +53,7 @@ async def demo_pipeline():
     ]
     
     articles = await parser.parse_all_feeds(feeds)
+    await parser.aclose()
     print(f"✅ Fetched {len(articles)} articles\n")
     
     # Show article titles
@@ -5,9 +5,24 @@ Loads environment variables from .env file.
 """
 
 import os
+import sys
 import asyncio
+import logging
 from pathlib import Path
-from dotenv import load_dotenv
+
+import orjson
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    # Installing packages from a test script is opt-in
+    if os.environ.get('AUTO_INSTALL_DEPS') != '1':
+        sys.exit("python-dotenv is missing: pip install -r requirements.txt "
+                 "(or set AUTO_INSTALL_DEPS=1 to install it now)")
+    print("Installing python-dotenv...")
+    import subprocess
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "python-dotenv"])
+    from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
@@ -15,13 +30,15 @@ load_dotenv()
 # Change to the ai-news-summarizer directory
 os.chdir(Path(__file__).parent)
 
-# Import and run
-from src.pipeline.news_pipeline import NewsPipeline
+# Run in-process unless DAGGER=1 asks for the Dagger engine (as CI does)
+os.environ.setdefault('DAGGER', '0')
+
+logger = logging.getLogger(__name__)
 
 
 async def quick_test():
     """Run a quick test of the pipeline."""
-    print("🚀 Running quick test with Dagger...")
+    print(f"🚀 Running quick test {'with Dagger' if os.environ['DAGGER'] == '1' else 'in-process'}...")
     print(f"📍 Working directory: {os.getcwd()}")
     print(f"🔑 API Key loaded: {'ANTHROPIC_API_KEY' in os.environ}")
     
@@ -44,7 +61,10 @@ async def quick_test():
             'provider': 'anthropic',
             'model': 'claude-3-opus-20240229',
             'max_articles_per_run': 3,
-            'temperature': 0.7
+            'temperature': 0.7,
+            # Stay under the API tier's limits rather than backing off from 429s
+            'requests_per_minute': 40,
+            'tokens_per_minute': 16000
         },
         'publishing': {
             'markdown': {
@@ -63,30 +83,40 @@ async def quick_test():
         'timeout': 30
     }
     
-    # Save test config
+    # Save test config; an unchanged file keeps its mtime, so the pipeline's parsed-config cache stays valid
     import yaml
-    with open('config/test_config.yaml', 'w') as f:
-        yaml.dump(test_config, f)
+    try:
+        from yaml import CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeDumper
+    config_path = Path('config/test_config.yaml')
+    new_config = yaml.dump(test_config, Dumper=SafeDumper, sort_keys=True)
+    old_config = config_path.read_text() if config_path.exists() else None
+    if new_config != old_config:
+        config_path.write_text(new_config)
     
     try:
+        # Imported here so the banner prints before Dagger, the LLM SDKs and the scrapers load
+        from src.pipeline.news_pipeline import NewsPipeline
+        
         # Run pipeline
         pipeline = NewsPipeline('config/test_config.yaml')
-        metrics = await pipeline.run_pipeline()
+        try:
+            metrics = await pipeline.run_pipeline()
+        finally:
+            await pipeline.close()
         
         print("\n✅ Test completed successfully!")
-        print(f"📊 Results:")
-        print(f"  - Articles scraped: {metrics.articles_scraped}")
-        print(f"  - Articles summarized: {metrics.articles_summarized}")
-        print(f"  - Files published: {metrics.articles_published}")
-        print(f"  - Duration: {(metrics.end_time - metrics.start_time).total_seconds():.1f}s")
         
-        # Check output
-        output_dir = Path('./output')
-        if output_dir.exists():
-            files = list(output_dir.glob('*.md'))
-            print(f"\n📄 Generated files:")
-            for file in files[:5]:
-                print(f"  - {file.name}")
+        # A few generated files by name; scandir reads directory entries without a stat per file
+        output_files = []
+        if os.path.isdir('./output'):
+            with os.scandir('./output') as entries:
+                output_files = [entry.name for entry in entries if entry.name.endswith('.md')][:5]
+        
+        # One machine-readable line for CI
+        logger.info("Quick test results: %s",
+                    orjson.dumps({**metrics.to_dict(), 'output_files': output_files}).decode())
         
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
@@ -94,13 +124,13 @@ async def quick_test():
 
 
 if __name__ == "__main__":
-    # Install python-dotenv if not present
+    logging.basicConfig(level=logging.INFO)
+    
+    # libuv-backed event loop where available (Linux/macOS)
     try:
-        from dotenv import load_dotenv
+        import uvloop
+        uvloop.install()
     except ImportError:
-        print("Installing python-dotenv...")
-        import subprocess
-        subprocess.check_call(["pip", "install", "python-dotenv"])
-        from dotenv import load_dotenv
+        pass
     
     asyncio.run(quick_test())
\ No newline at end of file